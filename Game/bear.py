@@ -0,0 +1,66 @@
+""" File containing the behaviour of the bear NPC. """
+
+
+from solver import Solver
+
+
+class BearAI:
+    """ Choose the moves of the bear NPC of a game.
+
+    The bear goes through one of the open junctions of its cell, drawn randomly
+    or, when hunting, among those leading closest to a living player according
+    to the distance field to the players. This field is computed again only when
+    the players moved. The bear does not use the wormholes but the field does,
+    so it can lead the bear to a wormhole.
+
+    Attributes
+    ----------
+    game: game
+    hunting: bool
+
+    Methods
+    -------
+    __init__
+    choose_move
+    """
+    def __init__(self, game, hunting=False):
+        """ Initialize the AI of the bear of game. """
+        self.game = game
+        self.hunting = hunting
+        self._solver = None
+        self._targets = None
+        self._field = None
+
+
+    def _get_field(self):
+        """ Return the distance field to the living players, None if there are none. """
+        game = self.game
+        targets = tuple(sorted(game.players[player].position for player in game.alive if player != 'Bear NPC'))
+        if targets != self._targets:
+            if self._solver is None or self._solver.labyrinth is not game.labyrinth:
+                self._solver = Solver(game.labyrinth)
+            self._targets = targets
+            self._field = self._solver.distances_to(targets) if targets else None
+        return self._field
+
+
+    def choose_move(self):
+        """ Return the move of the bear as a pair (direction, position), None if it cannot move. """
+        game = self.game
+        labyrinth = game.labyrinth
+        moves = labyrinth.open_moves[game.players['Bear NPC'].position]
+        if not moves: return None
+
+        field = self._get_field() if self.hunting else None
+        if field is not None:
+            size = labyrinth.size
+            drift = labyrinth.river_drift
+            distances = []
+            for direction, (x, y) in moves:
+                x, y = drift.get((x, y), (x, y))
+                distances.append(field[x * size + y])
+            reachable = [distance for distance in distances if distance >= 0]
+            if reachable:
+                moves = [move for move, distance in zip(moves, distances) if distance == min(reachable)]
+
+        return game.rng.choice(moves)
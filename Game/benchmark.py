@@ -0,0 +1,239 @@
+""" File containing the benchmarks of the generation of the labyrinths and of the game actions.
+
+Run this file to time and profile the memory of the generation for several
+sizes and every combination of options, and to time the actions of a turn.
+The results are written in a JSON file which can be compared to a baseline.
+"""
+
+
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+from multiprocessing import Pool, TimeoutError
+
+from cell import Content
+from commands import MOVES, SHOTS, SKIP
+from game import Game
+from grid import GridLabyrinth
+from labyrinth import Labyrinth
+from player import Player
+from progress import NullProgress, TerminalProgress
+from weapon import PISTOL
+
+
+OPTIONS = ['wormhole', 'river', 'bear', 'hospital']
+LABYRINTH_CLASSES = {'labyrinth': Labyrinth, 'grid': GridLabyrinth}
+
+
+def get_options_combinations():
+    """ Return the dictionaries of every combination of options. """
+    return [dict(zip(OPTIONS, values)) for values in itertools.product([False, True], repeat=len(OPTIONS))]
+
+
+def _options_name(options: dict):
+    """ Return the name of a combination of options, e.g. 'river+wormhole'. """
+    return '+'.join(opt for opt in OPTIONS if options.get(opt)) or 'none'
+
+
+def _time_generation(task):
+    """ Return the timings and the memory used to generate labyrinths of a size with options. """
+    class_name, size, options, repeat = task
+    labyrinth_class = LABYRINTH_CLASSES[class_name]
+    times = []
+    for seed in range(repeat):
+        start = time.perf_counter()
+        labyrinth_class(size, 2, options, seed=seed)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    labyrinth = labyrinth_class(size, 2, options, seed=0)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del labyrinth
+
+    return {'min': min(times), 'mean': sum(times) / len(times), 'peak_bytes': peak, 'retained_bytes': retained}
+
+
+def benchmark_generation(sizes, options_list=None, class_name='labyrinth', repeat=3, timeout=60., progress=None):
+    """ Return the results of the generation of labyrinths of each size with each combination of options.
+
+    Each case is run in another process and is recorded as a timeout if it
+    takes more than timeout seconds. Every combination of options is expected
+    to be generated well within it, so that a timeout is a regression.
+    """
+    progress = progress if progress is not None else NullProgress()
+    cases = list(itertools.product(sizes, options_list or get_options_combinations()))
+    progress.start('Benchmarking the generation...', len(cases))
+    results = []
+    for size, options in cases:
+        result = {'class': class_name, 'size': size, 'options': _options_name(options), 'status': 'ok'}
+        with Pool(1) as pool:
+            try: result.update(pool.apply_async(_time_generation, [(class_name, size, options, repeat)]).get(timeout))
+            except TimeoutError: result['status'] = 'timeout'
+        results.append(result)
+        progress.update(len(results))
+
+    progress.finish()
+    return results
+
+
+def _time_calls(function, number: int):
+    """ Return the time of a call of function in microseconds, the best of five batches of number calls. """
+    best = float('inf')
+    for i in range(5):
+        start = time.perf_counter()
+        for j in range(number): function()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+def _make_game(size: int, options: dict, players: dict, seed=0):
+    """ Return a game on a new labyrinth with players placed randomly. """
+    game = Game(Labyrinth(size, len(players), options, seed=seed), players, seed=seed)
+    game.randomly_place_players()
+    return game
+
+
+def benchmark_turns(size=16, number=1000, seed=0):
+    """ Return the time in microseconds of each action of a turn in a labyrinth of size. """
+    options = {'wormhole': True, 'river': True, 'bear': True}
+    results = {}
+
+    # A single player so that the moves and shots never hit anyone
+    game = _make_game(size, options, {'A': Player(weapon=PISTOL)}, seed)
+    labyrinth = game.labyrinth
+    position = next(pos for pos, moves in labyrinth.open_moves.items()
+                        if moves and labyrinth.cells[pos].content == Content.EMPTY)
+    direction = labyrinth.open_moves[position][0][0]
+    move_action, shot_action = MOVES[direction], SHOTS[direction]
+
+    def move():
+        game.set_position('A', position)
+        game.move_player('A', move_action)
+    results['move'] = move
+
+    results['shoot'] = lambda: game.shoot('A', shot_action)
+
+    arsenal = next(pos for pos, cell in labyrinth.cells.items() if cell.content == Content.ARSENAL)
+    def activate():
+        game.set_position('A', arsenal)
+        game.activate_cell('A')
+    results['activate'] = activate
+
+    wormhole = labyrinth.wormholes[0].position
+    def wormhole_travel():
+        game.set_position('A', wormhole)
+        game.activate_cell('A')
+    results['wormhole'] = wormhole_travel
+
+    source = labyrinth.river[0].position
+    def river():
+        game.set_position('A', source)
+        game.resolve_terrain('A')
+    results['river'] = river
+
+    results['game_over'] = game.is_game_over
+    results['step'] = lambda: game.step('A', SKIP)
+
+    # The bear starts from the same cell at each call, the player being out of its reach
+    bear_game = _make_game(size, options, {'A': Player(), 'Bear NPC': Player()}, seed)
+    bear_start = bear_game.players['Bear NPC'].position
+    far = max(bear_game.labyrinth.cells, key=lambda pos: abs(pos[0] - bear_start[0]) + abs(pos[1] - bear_start[1]))
+    bear_game.set_position('A', far)
+    for hunting in [False, True]:
+        def bear(hunting=hunting):
+            bear_game.bear.hunting = hunting
+            bear_game.set_position('Bear NPC', bear_start)
+            bear_game.move_bear_npc()
+        results['bear hunting' if hunting else 'bear'] = bear
+
+    return [{'size': size, 'action': action, 'us_per_call': _time_calls(function, number)}
+            for action, function in results.items()]
+
+
+def run(sizes, class_name='labyrinth', repeat=3, timeout=60., turn_size=16, turn_number=1000, progress=None):
+    """ Run all the benchmarks and return their results. """
+    return {'python': platform.python_version(),
+            'machine': platform.machine(),
+            'generation': benchmark_generation(sizes, None, class_name, repeat, timeout, progress),
+            'turns': benchmark_turns(turn_size, turn_number)}
+
+
+def _index_results(results: dict):
+    """ Return the measures of results indexed by case. """
+    measures = {}
+    for result in results['generation']:
+        if result['status'] != 'ok': continue
+        case = 'generation', result['class'], result['size'], result['options']
+        measures[case + ('time',)] = result['min']
+        measures[case + ('memory',)] = result['peak_bytes']
+    for result in results['turns']:
+        measures['turn', result['size'], result['action'], 'time'] = result['us_per_call']
+    return measures
+
+
+def _index_statuses(results: dict):
+    """ Return the statuses of the generation cases of results indexed by case. """
+    return {('generation', result['class'], result['size'], result['options'], 'status'): result['status']
+            for result in results['generation']}
+
+
+def compare(results: dict, baseline: dict, threshold=.2):
+    """ Return the measures of results higher than in baseline by more than threshold.
+
+    The regressions are returned as tuples (case, baseline value, value). The
+    generation cases which are not ok, e.g. which timed out, are regressions
+    as well whatever their status in baseline, their values being the statuses.
+    """
+    baseline_statuses = _index_statuses(baseline)
+    regressions = [(case, baseline_statuses.get(case), status) for case, status in _index_statuses(results).items()
+                                                                if status != 'ok']
+
+    measures = _index_results(results)
+    baseline_measures = _index_results(baseline)
+    return regressions + [(case, baseline_measures[case], value) for case, value in measures.items()
+                                                                  if case in baseline_measures
+                                                                     and value > baseline_measures[case] * (1 + threshold)]
+
+
+if __name__ == '__main__':
+
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Benchmark the generation of the labyrinths and the game actions.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[4, 8, 16, 32, 64, 128, 256])
+    parser.add_argument('--class', dest='class_name', choices=sorted(LABYRINTH_CLASSES), default='labyrinth')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=60., help='seconds allowed to each generation case')
+    parser.add_argument('--turn-size', type=int, default=16)
+    parser.add_argument('--turn-number', type=int, default=1000)
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--compare', default=None, help='baseline JSON file to compare the results to')
+    parser.add_argument('--threshold', type=float, default=.2, help='relative increase reported as a regression')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.class_name, args.repeat, args.timeout, args.turn_size, args.turn_number,
+                  TerminalProgress())
+    with open(args.output, 'w') as file: json.dump(results, file, indent=2)
+    print('Results written in ' + args.output)
+
+    if args.compare is None:
+        failures = [result for result in results['generation'] if result['status'] != 'ok']
+        for result in failures:
+            print('Failure generation {} {} {}: {}'.format(result['class'], result['size'], result['options'],
+                                                           result['status']))
+        if failures: sys.exit(1)
+    else:
+        with open(args.compare) as file: baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        for case, baseline_value, value in regressions:
+            if isinstance(value, str):
+                print('Regression {}: {} -> {}'.format(' '.join(map(str, case)), baseline_value, value))
+                continue
+            print('Regression {}: {:.4g} -> {:.4g} ({:+.0%})'.format(' '.join(map(str, case)), baseline_value,
+                                                                     value, value / baseline_value - 1))
+        if regressions: sys.exit(1)
+        print('No regression')
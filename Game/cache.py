@@ -0,0 +1,127 @@
+""" File containing the cache of generated labyrinths. """
+
+
+import hashlib
+import os
+import pickle
+import sys
+from collections import OrderedDict
+
+from labyrinth import Labyrinth
+
+
+def estimate_size(labyrinth: Labyrinth):
+    """ Return an estimation of the memory used by a labyrinth in bytes, counting only the tables already built. """
+    size = sys.getsizeof(labyrinth.cells) + len(labyrinth.junctions)
+    if isinstance(labyrinth.cells, dict):
+        position = next(iter(labyrinth.cells))
+        size += (sys.getsizeof(labyrinth.cells[position]) + sys.getsizeof(position)) * len(labyrinth.cells)
+    contents = getattr(labyrinth, 'contents', None)
+    if contents is not None: size += sys.getsizeof(contents)
+
+    # The tables built on first use are read from the attributes not to build them.
+    tables = vars(labyrinth)
+    for name in ['move_masks', 'river_index', 'river_drift', 'next_wormhole']:
+        if name in tables: size += sys.getsizeof(tables[name])
+    if 'fire_ranges' in tables: size += sum(sys.getsizeof(ranges) for ranges in tables['fire_ranges'].values())
+    for name in ['open_moves', 'neighbors', 'interior_neighbors']:
+        table = tables.get(name)
+        if table: size += sys.getsizeof(table) + sys.getsizeof(next(iter(table.values()))) * len(table)
+
+    return size
+
+
+class LabyrinthCache:
+    """ Cache of generated labyrinths keyed by size, number of player starters, options and seed.
+
+    Labyrinths are kept in memory up to max_bytes, the least recently used
+    being evicted first, and pickled in directory if it is specified so that
+    they can be loaded instead of generated again. A clone of the cached
+    labyrinth is returned so that a game can change it without changing
+    the cached one.
+
+    Attributes
+    ----------
+    max_bytes: int
+    directory: str or None
+    labyrinth_class: type
+    nbytes: int
+    hits: int
+    misses: int
+
+    Methods
+    -------
+    __init__
+    get
+    clear
+    """
+    def __init__(self, max_bytes=64 * 2**20, directory=None, labyrinth_class=Labyrinth):
+        """ Initialize an empty cache. """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.labyrinth_class = labyrinth_class
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._labyrinths = OrderedDict()
+
+        if directory is not None: os.makedirs(directory, exist_ok=True)
+
+
+    def _make_key(self, size: int, nb_player_starters: int, options, seed):
+        """ Return the key of a labyrinth, with the options in a fixed order. """
+        options = tuple(sorted((opt, bool(val)) for opt, val in (options or {}).items()))
+        return self.labyrinth_class.__name__, size, nb_player_starters, options, seed
+
+
+    def _get_path(self, key):
+        """ Return the path of the file storing a labyrinth in the directory. """
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, name + '.pickle')
+
+
+    def get(self, size: int, nb_player_starters: int, options=None, seed=None):
+        """ Return a clone of the labyrinth made with these parameters, generating it if needed.
+
+        A labyrinth without seed is random so it is generated and not cached.
+        """
+        if seed is None: return self.labyrinth_class(size, nb_player_starters, options)
+
+        key = self._make_key(size, nb_player_starters, options, seed)
+        if key in self._labyrinths:
+            self.hits += 1
+            self._labyrinths.move_to_end(key)
+            return self._labyrinths[key][0].clone()
+
+        self.misses += 1
+        labyrinth = None
+        if self.directory is not None and os.path.exists(self._get_path(key)):
+            with open(self._get_path(key), 'rb') as file: labyrinth = pickle.load(file)
+
+        if labyrinth is None:
+            labyrinth = self.labyrinth_class(size, nb_player_starters, options, seed=seed)
+            if self.directory is not None:
+                with open(self._get_path(key), 'wb') as file: pickle.dump(labyrinth, file)
+
+        # The tables are built once here instead of once by each clone
+        labyrinth.init_tables()
+        self._add(key, labyrinth)
+        return labyrinth.clone()
+
+
+    def _add(self, key, labyrinth: Labyrinth):
+        """ Keep a labyrinth in memory and evict the least recently used ones above max_bytes. """
+        nbytes = estimate_size(labyrinth)
+        if nbytes > self.max_bytes: return
+
+        self._labyrinths[key] = labyrinth, nbytes
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted_nbytes) = self._labyrinths.popitem(last=False)
+            self.nbytes -= evicted_nbytes
+
+
+    def clear(self):
+        """ Remove all the labyrinths kept in memory. """
+        self._labyrinths.clear()
+        self.nbytes = 0
@@ -1,22 +1,39 @@
 """ File containing the cell object. """
 
 
+from enum import IntEnum
+
+
+class Content(IntEnum):
+	""" Codes of the possible contents of a cell. """
+	EMPTY = 0
+	RIVER = 1
+	EXIT = 2
+	TREASURE = 3
+	MAP = 4
+	ARSENAL = 5
+	WORMHOLE = 6
+	HOSPITAL = 7
+
+
 class Cell:
 	""" Make a cell.
 
 	Attributes
 	----------
-	content: str
+	content: content
 	position: tuple of int or None
 	
 	Methods
 	-------
 	__init__
 	"""
-	def __init__(self, content='empty', position=None):
+	__slots__ = ('content', 'position')
+
+	def __init__(self, content=Content.EMPTY, position=None):
 		""" Initalize a cell.
 
         If not specified the cell is empty and the position is None.
         """
 		self.content = content
-		self.position = position
\ No newline at end of file
+		self.position = position
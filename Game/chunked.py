@@ -0,0 +1,468 @@
+""" File containing the chunked labyrinth object, generated tile by tile on first use.
+
+The board is split into square tiles whose contents and walls are generated
+from the seed and the tile coordinates the first time a move, a shot, a cell
+or a window touches them, so that a labyrinth far too large to be generated
+at once only costs the memory of the tiles played in. The least recently used
+tiles are evicted once there are more than max_tiles, and generated again
+identically when touched again, only the contents of the changed tiles being
+kept aside.
+
+Each tile is opened with a disjoint set until all its cells are accessible,
+and every edge shared by two tiles has at least one opening, which makes the
+whole board accessible without ever looking at more than one tile.
+"""
+
+
+from collections import OrderedDict
+from collections.abc import Mapping
+from random import Random
+
+from cell import Cell, Content
+from commands import UP, DOWN, LEFT, RIGHT
+from disjoint_set import DisjointSet
+from junctions import Junctions
+from labyrinth import Labyrinth
+from progress import NullProgress
+from rng import fork_rng
+
+
+DIRECTIONS = [('up', 0, 1, UP), ('down', 0, -1, DOWN), ('left', -1, 0, LEFT), ('right', 1, 0, RIGHT)]
+
+
+class Tile:
+    """ Contents, walls and move masks of a square part of a chunked labyrinth.
+
+    The contents and the move masks of the local position (i, j) are at index
+    i * tile_size + j, the junctions only storing the walls inside the tile.
+
+    Attributes
+    ----------
+    contents: bytearray
+    junctions: junctions
+    masks: bytearray
+    dirty: bool
+    """
+    __slots__ = ('contents', 'junctions', 'masks', 'dirty')
+
+    def __init__(self, tile_size: int):
+        """ Initialize an empty tile without wall. """
+        self.contents = bytearray(tile_size**2)
+        self.junctions = Junctions(tile_size)
+        self.masks = bytearray(tile_size**2)
+        self.dirty = False
+
+
+class ChunkedCells(Mapping):
+    """ Mapping from positions to copies of the cells of a chunked labyrinth.
+
+    The cells are made on access from the tiles, changing them does not change
+    the labyrinth, which is done with set_content. Iterating over the mapping
+    generates every tile.
+
+    Methods
+    -------
+    __init__
+    __getitem__
+    __contains__
+    __iter__
+    __len__
+    """
+    def __init__(self, labyrinth):
+        """ Initialize a view of the cells of labyrinth. """
+        self._labyrinth = labyrinth
+
+
+    def __getitem__(self, position):
+        if position not in self: raise KeyError(position)
+        return Cell(Content(self._labyrinth.get_content(position)), position)
+
+
+    def __contains__(self, position):
+        try: x, y = position
+        except (TypeError, ValueError): return False
+        return 0 <= x < self._labyrinth.size and 0 <= y < self._labyrinth.size
+
+
+    def __iter__(self):
+        size = self._labyrinth.size
+        return ((x, y) for x in range(size) for y in range(size))
+
+
+    def __len__(self):
+        return self._labyrinth.size**2
+
+
+class ChunkedJunctions:
+    """ Read only junctions of a chunked labyrinth, see Junctions. """
+    def __init__(self, labyrinth):
+        """ Initialize a view of the junctions of labyrinth. """
+        self._labyrinth = labyrinth
+
+
+    def __getitem__(self, key):
+        c1, c2 = key
+        if isinstance(c1, Cell): c1 = c1.position
+        if isinstance(c2, Cell): c2 = c2.position
+        if c1 not in self._labyrinth.cells or c2 not in self._labyrinth.cells: raise KeyError(key)
+        (x1, y1), (x2, y2) = c1, c2
+        for direction, dx, dy, bit in DIRECTIONS:
+            if (x1 + dx, y1 + dy) == (x2, y2):
+                if self._labyrinth.get_mask(c1) & bit: return 'nothing'
+                return 'wall'
+        raise KeyError(key)
+
+
+    def __contains__(self, key):
+        try: self[key]
+        except (KeyError, TypeError, ValueError): return False
+        return True
+
+
+    def __len__(self):
+        return 2 * self._labyrinth.size * (self._labyrinth.size - 1)
+
+
+class MoveMasksView:
+    """ Move masks of a chunked labyrinth, the mask of (x, y) being at x * size + y. """
+    def __init__(self, labyrinth):
+        self._labyrinth = labyrinth
+
+
+    def __getitem__(self, idx: int):
+        return self._labyrinth.get_mask(divmod(idx, self._labyrinth.size))
+
+
+    def __len__(self):
+        return self._labyrinth.size**2
+
+
+class FireRangeView:
+    """ Fire ranges of a chunked labyrinth in a direction, the range of (x, y) being at x * size + y.
+
+    The cells are counted up to max_fire_range, which must be more than the
+    distance of every weapon so that the shots are resolved as with the whole range.
+    """
+    def __init__(self, labyrinth, dx: int, dy: int, bit: int):
+        self._labyrinth = labyrinth
+        self._move = dx, dy, bit
+
+
+    def __getitem__(self, idx: int):
+        labyrinth = self._labyrinth
+        dx, dy, bit = self._move
+        x, y = divmod(idx, labyrinth.size)
+        fire_range = 0
+        while fire_range < labyrinth.max_fire_range and labyrinth.get_mask((x, y)) & bit:
+            x, y = x + dx, y + dy
+            fire_range += 1
+        return fire_range
+
+
+class OpenMovesView(Mapping):
+    """ Mapping from positions to the moves possible from them in a chunked labyrinth, see Labyrinth.open_moves. """
+    def __init__(self, labyrinth):
+        self._labyrinth = labyrinth
+
+
+    def __getitem__(self, position):
+        if position not in self._labyrinth.cells: raise KeyError(position)
+        x, y = position
+        mask = self._labyrinth.get_mask(position)
+        return tuple((direction, (x + dx, y + dy)) for direction, dx, dy, bit in DIRECTIONS if mask & bit)
+
+
+    def __iter__(self):
+        return iter(self._labyrinth.cells)
+
+
+    def __len__(self):
+        return len(self._labyrinth.cells)
+
+
+class ChunkedLabyrinth(Labyrinth):
+    """ Make a labyrinth generated tile by tile on first use.
+
+    The size must be a multiple of tile_size. The exit, the treasure and the
+    map are placed when the labyrinth is made, the arsenals and the walls of a
+    tile when it is first touched. The river and the wormholes are not
+    supported, and neither are the tables indexed over the whole board such as
+    the neighbors, so the bear can wander but not hunt and the labyrinth can be
+    neither cloned nor serialized. The map shows the window of window_size
+    cells around the map cell, made with window.
+
+    Attributes
+    ----------
+    tile_size: int
+    max_tiles: int
+    window_size: int
+    seed: int
+    tiles: OrderedDict
+    cells: chunked cells
+    junctions: chunked junctions
+    move_masks: move masks view
+    fire_ranges: dict of fire range view
+    open_moves: open moves view
+
+    Methods
+    -------
+    __init__
+    get_content
+    get_mask
+    set_content
+    sample_empty_positions
+    window
+    map_view
+    """
+    # Longest fire range computed, more than the distance of every weapon
+    max_fire_range = 16
+
+
+    def __init__(self, size: int, nb_player_starters: int, options=None, seed=None, tile_size=32, max_tiles=256,
+                 window_size=16, progress=None):
+        """ Initialize a chunked labyrinth, see Labyrinth.
+
+        The tiles are generated from seed and their coordinates, a seed being
+        drawn if it is not specified so that an evicted tile is always
+        generated again identically. At most max_tiles tiles are kept in memory.
+        """
+        if size % tile_size: raise ValueError('The size must be a multiple of the tile size')
+        if options and (options.get('river') or options.get('wormhole')):
+            raise ValueError('The river and the wormholes are not supported by chunked labyrinths')
+
+        self.progress = progress if progress is not None else NullProgress()
+        self.seed = seed if seed is not None else Random().getrandbits(64)
+        self.rng = fork_rng(self.seed, 'labyrinth')
+        self.size = size
+        self.nb_player_starters = nb_player_starters
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.window_size = min(window_size, size)
+
+        self.options = {'wormhole': False, 'river': False, 'bear': False, 'hospital': False}
+        if options != None:
+            for opt, val in options.items():
+                if opt in self.options.keys():
+                    self.options[opt] = val
+
+        self.wormholes = []
+        self.river = []
+        self.river_positions = set()
+        self.river_index = {}
+        self.river_drift = {}
+        self.next_wormhole = {}
+
+        self.tiles = OrderedDict()
+        self._edges = OrderedDict()
+        self._changes = {}
+        self._accessible = DisjointSet(tile_size**2)
+
+        self.cells = ChunkedCells(self)
+        self.junctions = ChunkedJunctions(self)
+        self.move_masks = MoveMasksView(self)
+        self.fire_ranges = {(dx, dy): FireRangeView(self, dx, dy, bit) for direction, dx, dy, bit in DIRECTIONS}
+        self.open_moves = OpenMovesView(self)
+
+        self.progress.start('Set up specific cells...')
+        self._init_specials()
+        self.progress.finish()
+
+
+    def __getattr__(self, name):
+        # Nothing is indexed over the whole board.
+        raise AttributeError(name)
+
+
+    def _init_specials(self):
+        """ Draw the positions of the exit, on the edge, of the treasure and of the map. """
+        size = self.size
+        side, offset = self.rng.randrange(4), self.rng.randrange(size)
+        exit_pos = [(0, offset), (size - 1, offset), (offset, 0), (offset, size - 1)][side]
+        self._specials = {exit_pos: Content.EXIT}
+        for content in [Content.TREASURE, Content.MAP]:
+            pos = exit_pos
+            while pos in self._specials: pos = self.rng.randrange(size), self.rng.randrange(size)
+            self._specials[pos] = content
+
+        self.exit_cell = Cell(Content.EXIT, exit_pos)
+        self.treasure_cell = Cell(Content.TREASURE, next(pos for pos, content in self._specials.items()
+                                                             if content == Content.TREASURE))
+
+
+    def _get_edge(self, kind: str, tx: int, ty: int):
+        """ Return the walls of an edge shared by two tiles, 1 being a wall.
+
+        The edge 'h' is between the tiles (tx, ty) and (tx + 1, ty), indexed
+        by the local y, and the edge 'v' between (tx, ty) and (tx, ty + 1),
+        indexed by the local x. One of its junctions is always open.
+        """
+        key = kind, tx, ty
+        edge = self._edges.get(key)
+        if edge is not None:
+            self._edges.move_to_end(key)
+            return edge
+
+        rng = fork_rng(self.seed, 'edge', kind, tx, ty)
+        edge = bytearray(rng.random() < .4 for i in range(self.tile_size))
+        edge[rng.randrange(self.tile_size)] = 0
+
+        self._edges[key] = edge
+        if len(self._edges) > 4 * self.max_tiles: self._edges.popitem(last=False)
+        return edge
+
+
+    def _make_tile(self, tx: int, ty: int):
+        """ Generate the tile (tx, ty) from the seed and its coordinates. """
+        t = self.tile_size
+        rng = fork_rng(self.seed, 'tile', tx, ty)
+        tile = Tile(t)
+        contents = tile.contents
+
+        # Place the special cells falling in the tile, then the arsenals.
+        for (x, y), content in self._specials.items():
+            if x // t == tx and y // t == ty: contents[x % t * t + y % t] = content
+        free = [idx for idx in range(t * t) if contents[idx] == Content.EMPTY]
+        for idx in rng.sample(free, k=min(rng.randint((t - 1)**2 // 4, t**2 // 4), len(free))):
+            contents[idx] = Content.ARSENAL
+
+        # Draw the walls, then open them until every cell of the tile is accessible.
+        horizontal, vertical = tile.junctions.horizontal, tile.junctions.vertical
+        horizontal[:] = bytes(rng.random() < .4 for i in range(len(horizontal)))
+        vertical[:] = bytes(rng.random() < .4 for i in range(len(vertical)))
+
+        accessible = self._accessible
+        accessible.reset()
+        walls = []
+        for i in range(t):
+            for j in range(t):
+                idx = i * t + j
+                if i < t - 1:
+                    if horizontal[idx]: walls.append((horizontal, idx, idx, idx + t))
+                    else: accessible.union(idx, idx + t)
+                if j < t - 1:
+                    if vertical[i * (t - 1) + j]: walls.append((vertical, i * (t - 1) + j, idx, idx + 1))
+                    else: accessible.union(idx, idx + 1)
+
+        for walls_array, wall_idx, idx1, idx2 in rng.sample(walls, k=len(walls)):
+            if accessible.nb_sets == 1: break
+            if accessible.union(idx1, idx2): walls_array[wall_idx] = 0
+
+        # Compute the move masks, the moves across the tile edges depending on the edges walls.
+        last = self.size // t - 1
+        up = self._get_edge('v', tx, ty) if ty < last else None
+        down = self._get_edge('v', tx, ty - 1) if ty > 0 else None
+        left = self._get_edge('h', tx - 1, ty) if tx > 0 else None
+        right = self._get_edge('h', tx, ty) if tx < last else None
+        masks = tile.masks
+        for i in range(t):
+            for j in range(t):
+                idx = i * t + j
+                mask = 0
+                if j < t - 1:
+                    if not vertical[i * (t - 1) + j]: mask |= UP
+                elif up is not None and not up[i]: mask |= UP
+                if j > 0:
+                    if not vertical[i * (t - 1) + j - 1]: mask |= DOWN
+                elif down is not None and not down[i]: mask |= DOWN
+                if i > 0:
+                    if not horizontal[idx - t]: mask |= LEFT
+                elif left is not None and not left[j]: mask |= LEFT
+                if i < t - 1:
+                    if not horizontal[idx]: mask |= RIGHT
+                elif right is not None and not right[j]: mask |= RIGHT
+                masks[idx] = mask
+
+        return tile
+
+
+    def _get_tile(self, tx: int, ty: int):
+        """ Return the tile (tx, ty), generating it if needed and evicting the least recently used. """
+        key = tx, ty
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            return tile
+
+        tile = self._make_tile(tx, ty)
+        changes = self._changes.get(key)
+        if changes is not None:
+            tile.contents[:] = changes
+            tile.dirty = True
+
+        self.tiles[key] = tile
+        if len(self.tiles) > self.max_tiles:
+            old_key, old_tile = self.tiles.popitem(last=False)
+            if old_tile.dirty: self._changes[old_key] = bytes(old_tile.contents)
+        return tile
+
+
+    def get_content(self, position: tuple):
+        """ Return the content code of the cell at position. """
+        x, y = position
+        t = self.tile_size
+        return self._get_tile(x // t, y // t).contents[x % t * t + y % t]
+
+
+    def get_mask(self, position: tuple):
+        """ Return the move mask of the cell at position, see Labyrinth.move_masks. """
+        x, y = position
+        t = self.tile_size
+        return self._get_tile(x // t, y // t).masks[x % t * t + y % t]
+
+
+    def set_content(self, position: tuple, content: Content):
+        """ Change the content of the cell at position. """
+        self.revision += 1
+        x, y = position
+        t = self.tile_size
+        tile = self._get_tile(x // t, y // t)
+        tile.contents[x % t * t + y % t] = content
+        tile.dirty = True
+
+
+    def sample_empty_positions(self, k: int, rng):
+        """ Return k distinct positions of empty cells drawn with rng, only generating their tiles. """
+        positions = []
+        while len(positions) < k:
+            pos = rng.randrange(self.size), rng.randrange(self.size)
+            if pos not in positions and self.get_content(pos) == Content.EMPTY: positions.append(pos)
+        return positions
+
+
+    def window(self, x0: int, y0: int, size: int):
+        """ Return a labyrinth copying the square of size cells whose lower left cell is (x0, y0).
+
+        The copy can be rendered and played as any labyrinth, its position
+        (x, y) being the position (x0 + x, y0 + y) of this labyrinth.
+        """
+        window = Labyrinth.__new__(Labyrinth)
+        window.rng = None
+        window.progress = NullProgress()
+        window.size = size
+        window.nb_player_starters = self.nb_player_starters
+        window.options = dict(self.options)
+        window.river, window.river_positions, window.wormholes = [], set(), []
+
+        window.cells = {(x, y): Cell(Content(self.get_content((x0 + x, y0 + y))), (x, y))
+                        for x in range(size) for y in range(size)}
+        junctions = window.junctions = Junctions(size)
+        for x in range(size):
+            for y in range(size):
+                mask = self.get_mask((x0 + x, y0 + y))
+                if x < size - 1: junctions.horizontal[x * size + y] = not mask & RIGHT
+                if y < size - 1: junctions.vertical[x * (size - 1) + y] = not mask & UP
+
+        window.treasure_cell = window.exit_cell = None
+        for cell in window.cells.values():
+            if cell.content == Content.TREASURE: window.treasure_cell = cell
+            if cell.content == Content.EXIT: window.exit_cell = cell
+        return window
+
+
+    def map_view(self):
+        """ Return the window of window_size cells around the map cell. """
+        x, y = next(pos for pos, content in self._specials.items() if content == Content.MAP)
+        half = self.window_size // 2
+        x0 = min(max(x - half, 0), self.size - self.window_size)
+        y0 = min(max(y - half, 0), self.size - self.window_size)
+        return self.window(x0, y0, self.window_size)
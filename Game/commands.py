@@ -0,0 +1,58 @@
+""" File containing the commands of the players compiled into actions.
+
+An action is a tuple (kind, dx, dy, bit) where (dx, dy) is the direction of a
+move or of a shot and bit is the flag of this direction in the move masks of
+the labyrinths. Each command is compiled once, the engine only handling the
+actions of the COMMANDS table.
+"""
+
+
+from collections import namedtuple
+from enum import IntEnum
+
+
+class Kind(IntEnum):
+    """ Kind of an action. """
+    MOVE = 0
+    SHOOT = 1
+    ACTIVATE = 2
+    SKIP = 3
+    EXIT = 4
+
+
+# Flags of the directions in the move masks
+UP = 1
+DOWN = 2
+LEFT = 4
+RIGHT = 8
+
+Action = namedtuple('Action', ['kind', 'dx', 'dy', 'bit'])
+
+DIRECTIONS = {'up': (0, 1, UP), 'down': (0, -1, DOWN), 'left': (-1, 0, LEFT), 'right': (1, 0, RIGHT)}
+MOVES = {direction: Action(Kind.MOVE, *vector) for direction, vector in DIRECTIONS.items()}
+SHOTS = {direction: Action(Kind.SHOOT, *vector) for direction, vector in DIRECTIONS.items()}
+ACTIVATE = Action(Kind.ACTIVATE, 0, 0, 0)
+SKIP = Action(Kind.SKIP, 0, 0, 0)
+EXIT = Action(Kind.EXIT, 0, 0, 0)
+
+COMMANDS = {'move up': MOVES['up'],
+            'move down': MOVES['down'],
+            'move left': MOVES['left'],
+            'move right': MOVES['right'],
+            'w': MOVES['up'],
+            's': MOVES['down'],
+            'a': MOVES['left'],
+            'd': MOVES['right'],
+            'shoot up': SHOTS['up'],
+            'shoot down': SHOTS['down'],
+            'shoot left': SHOTS['left'],
+            'shoot right': SHOTS['right'],
+            'activate cell': ACTIVATE,
+            'e': ACTIVATE,
+            'exit': EXIT,
+            'skip': SKIP}
+
+
+def parse_command(command: str):
+    """ Return the action of a command, None if it is unknown. """
+    return COMMANDS.get(command.strip().lower())
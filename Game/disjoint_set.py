@@ -0,0 +1,56 @@
+""" File containing the disjoint set object. """
+
+
+class DisjointSet:
+    """ Disjoint set (union-find) over the integers 0 to size - 1.
+
+    Uses union by size and path halving so that a sequence of operations
+    runs in near-linear time.
+
+    Attributes
+    ----------
+    parents: list of int
+    sizes: list of int
+    nb_sets: int
+
+    Methods
+    -------
+    __init__
+    find
+    union
+    reset
+    """
+    def __init__(self, size: int):
+        """ Initialize size singletons. """
+        self.parents = list(range(size))
+        self.sizes = [1] * size
+        self.nb_sets = size
+
+
+    def find(self, i: int):
+        """ Return the representative of the set containing i. """
+        parents = self.parents
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+
+    def union(self, i: int, j: int):
+        """ Merge the sets containing i and j, return False if they were already merged. """
+        i, j = self.find(i), self.find(j)
+        if i == j: return False
+
+        if self.sizes[i] < self.sizes[j]: i, j = j, i
+        self.parents[j] = i
+        self.sizes[i] += self.sizes[j]
+        self.nb_sets -= 1
+        return True
+
+
+    def reset(self):
+        """ Make every element a singleton again, reusing the lists. """
+        size = len(self.parents)
+        self.parents[:] = range(size)
+        self.sizes[:] = [1] * size
+        self.nb_sets = size
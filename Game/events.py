@@ -0,0 +1,65 @@
+""" File containing the objects describing what happens during a game. """
+
+
+def null_output(message: str):
+    """ Output sink discarding every message, used by default by the games. """
+    pass
+
+
+class Event:
+    """ Something that happened during an action.
+
+    Attributes
+    ----------
+    kind: str
+    player: str or None
+    message: str
+
+    Methods
+    -------
+    __init__
+    """
+    __slots__ = ('kind', 'player', 'message')
+
+    def __init__(self, kind: str, player=None, message=''):
+        """ Initialize an event. """
+        self.kind = kind
+        self.player = player
+        self.message = message
+
+
+    def __repr__(self):
+        return 'Event({!r}, {!r}, {!r})'.format(self.kind, self.player, self.message)
+
+
+class StepResult:
+    """ Result of an action played with Game.step.
+
+    Attributes
+    ----------
+    player: str
+    action: str
+    accepted: bool
+    reason: str
+    events: list of event
+    game_over: bool
+
+    Methods
+    -------
+    __init__
+    """
+    __slots__ = ('player', 'action', 'accepted', 'reason', 'events', 'game_over')
+
+    def __init__(self, player: str, action: str):
+        """ Initialize the result of an action not played yet. """
+        self.player = player
+        self.action = action
+        self.accepted = False
+        self.reason = ''
+        self.events = []
+        self.game_over = False
+
+
+    def __repr__(self):
+        return 'StepResult({!r}, {!r}, accepted={}, game_over={}, events={})'.format(
+            self.player, self.action, self.accepted, self.game_over, self.events)
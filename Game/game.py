@@ -1,13 +1,19 @@
 """ File containing the game object. """
 
 
-from random import random, choice, sample
+from random import Random
 
+from bear import BearAI
+from cell import Content
+from commands import Action, Kind, MOVES, SKIP, parse_command
+from events import Event, StepResult, null_output
+from instrumentation import INSTRUMENTS, instrumented, timed
 from labyrinth import Labyrinth
-from player import Player
-from weapon import Weapon
+from player import Player, Status
+from weapon import Weapon, PISTOL, SHOTGUN, BEAR_PAW
 
 
+@instrumented
 class Game:
     """ Class of a game of "The Labyrinth".
 
@@ -17,8 +23,15 @@ class Game:
     labyrinth: labyrinth
     turn: int
     players: dict
+    occupancy: dict
+    alive: dict
+    carriers: dict
+    escaped: str or None
     options: list of bool
     weapons: dict
+    renderer: renderer or None
+    bear: bear AI
+    rng: random.Random
 
     Methods
     -------
@@ -30,37 +43,124 @@ class Game:
     shoot
     player_hit
     activate_cell
+    river_move_player
+    resolve_terrain
     is_game_over
+    game_over_reason
+    set_position
+    players_at
+    step
     """
-    def __init__(self, labyrinth: Labyrinth, players: list, options=None):
-        """ Initialize a game according to the parameters entered. """
+    def __init__(self, labyrinth: Labyrinth, players: list, options=None, output=None, seed=None, rng=None,
+                 renderer=None, bear_hunting=False):
+        """ Initialize a game according to the parameters entered.
+
+        Messages describing the game are sent to output, a callable taking a
+        string, and are discarded if it is not specified. The map is drawn with
+        renderer if specified, or sent to output otherwise. The bear NPC hunts
+        the players if bear_hunting is True and wanders randomly otherwise.
+        The random draws are made with rng, a random.Random, or with a generator
+        seeded with seed if rng is not specified.
+        """
+        self.rng = rng if rng is not None else Random(seed)
+        self.output = output if output is not None else null_output
+        self.renderer = renderer
+        self.bear = BearAI(self, bear_hunting)
+        self._events = None
         self.game_over = False
         self.labyrinth = labyrinth
         self.turn = 0
         self.players = players
-        self.weapons = {'pistol': Weapon('pistol', 2, 5), 'shotgun': Weapon('shotgun', 3, 2)}
+        self.weapons = {'pistol': PISTOL, 'shotgun': SHOTGUN}
+        self._index_players()
+
+
+    def _index_players(self):
+        """ Index the names of the players by position.
+
+        occupancy maps a position to the names of the players there, stored as
+        the keys of a dict to be an ordered set. It must be kept up to date by
+        changing the positions with set_position.
+        """
+        self.occupancy = {}
+        self._players_order = {}
+        self.alive = {}
+        self.carriers = {}
+        self.escaped = None
+        for name, player in self.players.items():
+            self._add_player(name)
+            if player.position is not None: self.occupancy.setdefault(player.position, {})[name] = None
+            self._check_escape(name)
+
+
+    def _add_player(self, player: str):
+        """ Add a player to the order of the players and to the counters of the end of the game.
+
+        alive and carriers store the names of the players not dead and of the
+        players carrying the treasure as the keys of a dict, escaped is the name
+        of a player carrying the treasure in the exit room, so that the end of
+        the game is checked without looking at every player.
+        """
+        self._players_order[player] = len(self._players_order)
+        if self.players[player].status != Status.DEAD: self.alive[player] = None
+        if self.players[player].carry: self.carriers[player] = None
+
+
+    def _check_escape(self, player: str):
+        """ Record player as escaped if it carries the treasure in the exit room. """
+        if self.escaped is not None or player not in self.carriers: return
+        exit_cell = self.labyrinth.exit_cell
+        if exit_cell is not None and self.players[player].position == exit_cell.position: self.escaped = player
+
+
+    def set_position(self, player: str, position: tuple):
+        """ Move a player to position and update the occupancy index. """
+        previous = self.players[player].position
+        if previous is not None:
+            occupants = self.occupancy.get(previous, {})
+            occupants.pop(player, None)
+            if not occupants: self.occupancy.pop(previous, None)
+
+        self.players[player].position = position
+        self.occupancy.setdefault(position, {})[player] = None
+        if player not in self._players_order: self._add_player(player)
+        self._check_escape(player)
+
+
+    def players_at(self, position: tuple):
+        """ Return the names of the players at position in the order of the players. """
+        occupants = self.occupancy.get(position)
+        if not occupants: return []
+        if len(occupants) == 1: return list(occupants)
+        return sorted(occupants, key=self._players_order.__getitem__)
+
+
+    def _emit(self, kind: str, player, message: str):
+        """ Send a message to the output and record it as an event of the current step. """
+        if self._events is not None: self._events.append(Event(kind, player, message))
+        self.output(message)
 
 
     def display_rules(self):
         """ Display the labyrinth game's rules. """
-        print()
-        print("***************************************")
-        print("********* THE LABYRINTH GAME **********")
-        print("***************************************")
-        print("\nRules:")
-        print("- Be 1 to 4 players.")
-        print("- Find your way around a labyrinth to find the treasure and exit with it to win.")
-        print("- Alternatively find a weapon and kill all other players to win.")
-        print("\nCommands:")
-        print("- move <direction>")
-        print("shortcuts: w, s, a, d")
-        print("- shoot <direction>")
-        print("- activate cell")
-        print("shortcut: e")
-        print("- exit")
-        print("\nDirections: up, down, left, right\n")
-        print("That is all you need to know!")
-        print("Good luck to escape, you will need it...\n")
+        self.output('')
+        self.output("***************************************")
+        self.output("********* THE LABYRINTH GAME **********")
+        self.output("***************************************")
+        self.output("\nRules:")
+        self.output("- Be 1 to 4 players.")
+        self.output("- Find your way around a labyrinth to find the treasure and exit with it to win.")
+        self.output("- Alternatively find a weapon and kill all other players to win.")
+        self.output("\nCommands:")
+        self.output("- move <direction>")
+        self.output("shortcuts: w, s, a, d")
+        self.output("- shoot <direction>")
+        self.output("- activate cell")
+        self.output("shortcut: e")
+        self.output("- exit")
+        self.output("\nDirections: up, down, left, right\n")
+        self.output("That is all you need to know!")
+        self.output("Good luck to escape, you will need it...\n")
 
 
     def set_weapons(self):
@@ -83,136 +183,112 @@ class Game:
 
         Players are not placed on cells with special content.
         """
-        spec_contents = ['river', 'exit', 'treasure', 'map', 'arsenal', 'wormhole', 'hospital']
-        possible_positions = [pos for pos, cell in self.labyrinth.cells.items()
-                                  if cell.content not in spec_contents]
-
-        positions = sample(possible_positions, k=len(self.players))
+        positions = self.labyrinth.sample_empty_positions(len(self.players), self.rng)
         for player, pos in zip(self.players, positions): self.players[player].position = pos
+        self._index_players()
     
 
-    def is_move_possible(self, player: Player, move: str):
+    def is_move_possible(self, player: Player, move):
         """ Return if the move is possible and the reason why.
 
+        The move is an action, see commands.py, or a command compiled into one.
         If the players asked to exit the game it is executed here as well.
         """
-        if move == 'skip': return True, 'Just chill out man'
-
-        if move[:4] == 'move' or move in ['w', 's', 'a', 'd']:
-            direction = move[5:]
-            if move == 'w' or direction == 'up': x_move, y_move = 0, 1
-            if move == 's' or direction == 'down': x_move, y_move = 0, -1
-            if move == 'a' or direction == 'left': x_move, y_move = -1, 0
-            if move == 'd' or direction == 'right': x_move, y_move = 1, 0
+        if isinstance(move, str): move = parse_command(move)
+        if move is None: return False, 'Move not recognized'
+        kind = move.kind
+
+        if kind == Kind.SKIP: return True, 'Just chill out man'
+
+        if kind == Kind.MOVE:
             x, y = self.players[player].position
-            if (x + x_move, y + y_move) in self.labyrinth.cells.keys():
-                if self.labyrinth.junctions[(self.labyrinth.cells[x, y],
-                                             self.labyrinth.cells[x + x_move, y + y_move])] != 'wall':
-                    return True, 'Because I say so'
+            if self.labyrinth.move_masks[x * self.labyrinth.size + y] & move.bit: return True, 'Because I say so'
+            if (x + move.dx, y + move.dy) in self.labyrinth.cells:
                 return False, 'A wall prevents you to move in that direction'
             return False, 'The monolith prevents you to move in that direction'
 
-        if move[:5] == 'shoot':
+        if kind == Kind.SHOOT:
             weapon = self.players[player].weapon 
-            if weapon != None and weapon.name in ['pistol', 'shotgun']:
+            if weapon is PISTOL or weapon is SHOTGUN:
             	return True, 'Because you are armed to the teeth!'
             return False, 'You do not have anything to shoot, go home..!'
 
-        if move == 'activate cell' or move == 'e':
-            if self.labyrinth.cells[self.players[player].position] != 'empty':
+        if kind == Kind.ACTIVATE:
+            if self.labyrinth.cells[self.players[player].position].content != Content.EMPTY:
                 return True, 'This cell is not empty.'
             return False, 'There is nothing in this room, try again.'
 
         return False, 'Move not recognized'
     
 
-    def move_player(self, player: Player, direction: str):
-        """ Modify a player's position and describe the room. """
-        if direction == 'w' or direction == 'up': x_move, y_move = 0, 1
-        if direction == 's' or direction == 'down': x_move, y_move = 0, -1
-        if direction == 'a' or direction == 'left': x_move, y_move = -1, 0
-        if direction == 'd' or direction == 'right': x_move, y_move = 1, 0
-
+    @timed('game.move')
+    def move_player(self, player: Player, move: Action):
+        """ Modify a player's position according to a move action and describe the room. """
         x, y = self.players[player].position
-        self.players[player].position = (x + x_move, y + y_move)
+        self.set_position(player, (x + move.dx, y + move.dy))
         content = self.labyrinth.cells[self.players[player].position].content
 
-        if content == 'empty': print(player + ' is now in an empty room.')
-        if content == 'arsenal': print(player + ' is now now in an arsenal.')
-        if content == 'wormhole': print(player + ' is now in a room containing a wormhole.')
-        if content == 'treasure': print(player + ' is now in the treasure room.')
-        if content == 'map': print(player + ' is now in the map room.')
-        if content == 'exit':
+        if content == Content.EMPTY: self._emit('moved', player, player + ' is now in an empty room.')
+        if content == Content.ARSENAL: self._emit('moved', player, player + ' is now now in an arsenal.')
+        if content == Content.WORMHOLE: self._emit('moved', player, player + ' is now in a room containing a wormhole.')
+        if content == Content.TREASURE: self._emit('moved', player, player + ' is now in the treasure room.')
+        if content == Content.MAP: self._emit('moved', player, player + ' is now in the map room.')
+        if content == Content.EXIT:
             if self.players[player].carry:
-                print(player + ' is now in the exit room and can leave.')
-            else: print(player + ' is now in the exit room but you need the treasure to leave.')
-        for p in self.players:
-            if p != player and self.players[p].position == self.players[player].position:
-                print(player + ' finds itself in the same room as ' + p)
+                self._emit('moved', player, player + ' is now in the exit room and can leave.')
+            else: self._emit('moved', player, player + ' is now in the exit room but you need the treasure to leave.')
+        for p in self.players_at(self.players[player].position):
+            if p != player: self._emit('meet', player, player + ' finds itself in the same room as ' + p)
     
 
-    def shoot(self, player: Player, direction: str):
-        """ Check if another player is hit by player and describe what happens. """
-        if direction == 'up': x_move, y_move = 0, 1
-        if direction == 'down': x_move, y_move = 0, -1
-        if direction == 'left': x_move, y_move = -1, 0
-        if direction == 'right': x_move, y_move = 1, 0
+    @timed('game.shoot')
+    def shoot(self, player: Player, shot: Action):
+        """ Check if another player is hit by the shot action of player and describe what happens. """
+        x_move, y_move = shot.dx, shot.dy
 
         # If another player is present in the same cell, hit it and quit method.
         x1, y1 = self.players[player].position
-        for p in self.players:
-            if p != player and self.players[p].position == (x1, y1):
+        for p in self.players_at((x1, y1)):
+            if p != player:
                 self.player_hit(p, self.players[player].weapon)
                 return 0
 
-        # If the direction shooting at is directly a monolith then describe what happens.
-        x2, y2 = x1 + x_move, y1 + y_move
-        if (x2, y2) not in self.labyrinth.cells.keys():
-            print('The bullet hit a wall')
-            return 0
-
-        # Check cells one by one in the direction to see if a player is there and hit it if so.
-        # Stops if the cell is to far for the weapon's distance and describe what happens.
-        c1, c2 = self.labyrinth.cells[x1, y1], self.labyrinth.cells[x2, y2]
-        distance = 0
-        while (x2, y2) in self.labyrinth.cells.keys() and self.labyrinth.junctions[c1, c2] != 'wall':
-            
-            distance += 1
-            if distance > self.players[player].weapon.distance:
-                print('Nothing happens')
-                return 0
-            
-            for p in self.players:
-                if self.players[p].status == 'dead': continue
-                if self.players[p].position == (x2, y2):
-                    self.player_hit(p, self.players[player].weapon)
-                    return 0
-            
-            x1, y1 = x2, y2
-            x2, y2 = x1 + x_move, y1 + y_move
-            if (x2, y2) not in self.labyrinth.cells.keys():
-                print('The bullet hit a wall')
+        # Check the cells in the direction up to the first wall or the weapon's distance
+        # to see if a player is there and hit it if so, describe what happens otherwise.
+        size = self.labyrinth.size
+        fire_range = self.labyrinth.fire_ranges[x_move, y_move][x1 * size + y1]
+        weapon_distance = self.players[player].weapon.distance
+        for distance in range(1, min(fire_range, weapon_distance) + 1):
+            for p in self.players_at((x1 + distance * x_move, y1 + distance * y_move)):
+                if self.players[p].status == Status.DEAD: continue
+                self.player_hit(p, self.players[player].weapon)
                 return 0
-            c1, c2 = self.labyrinth.cells[x1, y1], self.labyrinth.cells[x2, y2]
-        print('The bullet hit a wall')
+
+        if fire_range > weapon_distance: self._emit('missed', player, 'Nothing happens')
+        else: self._emit('missed', player, 'The bullet hit a wall')
     
 
     def player_hit(self, player: Player, weapon: Weapon):
         """ Change player's status according to the weapon damage, describes what happened. """
         status = self.players[player].status
-        if weapon.damage == 3: self.players[player].status = 'dead'
+        if weapon.damage == 3: self.players[player].status = Status.DEAD
 
         if weapon.damage == 2:
-            if status != 'healthy': self.players[player].status = 'dead'
-            else: self.players[player].status = 'wounded'
+            if status != Status.HEALTHY: self.players[player].status = Status.DEAD
+            else: self.players[player].status = Status.WOUNDED
+        if self.players[player].status == Status.DEAD: self.alive.pop(player, None)
+        INSTRUMENTS.count('game.hits')
 
         if not self.players[player].carry:
-            print(player + ' got hit, and is now ' + self.players[player].status)
+            self._emit('hit', player, player + ' got hit, and is now ' + str(self.players[player].status))
         else:
-            self.labyrinth.cells[self.players[player].position].content = 'treasure'
-            print(player + ' got hit, dropped the treasure, and is now ' + self.players[player].status)
+            self.players[player].carry = False
+            self.carriers.pop(player, None)
+            self.labyrinth.set_content(self.players[player].position, Content.TREASURE)
+            self._emit('hit', player, player + ' got hit, dropped the treasure, and is now ' + str(self.players[player].status))
 
     
+    @timed('game.activate')
     def activate_cell(self, player: Player):
         """ Execute the cell action.
 
@@ -223,115 +299,148 @@ class Game:
         content = self.labyrinth.cells[self.players[player].position].content
         pos = self.labyrinth.cells[self.players[player].position].position
 
-        if content == 'map':
-            print('You approach some strange writing on a rock and understand it is a map.')
-            self.labyrinth.display_labyrinth()
+        if content == Content.MAP:
+            # The map is drawn before its message so that the renderer can draw only its changes.
+            if self.renderer is not None: self.renderer.draw(self.labyrinth.map_view())
+            else: self.labyrinth.map_view().display_labyrinth(self.output)
+            self._emit('map', player, 'You approach some strange writing on a rock and understand it is a map.')
 
-        if content == 'arsenal':
-            if random() < .5: weapon = 'pistol'
+        if content == Content.ARSENAL:
+            if self.rng.random() < .5: weapon = 'pistol'
             else: weapon = 'shotgun'
             self.players[player].weapon = self.weapons[weapon]
-            print('You picked up a ' + weapon)
-
-        if content == 'wormhole':
-            for i in range(len(self.labyrinth.wormholes)):
-                if self.labyrinth.wormholes[i] == self.labyrinth.cells[pos]:
-                    new_pos = self.labyrinth.wormholes[(i + 1) % len(self.labyrinth.wormholes)].position
-                    self.players[player].position = new_pos
-                    print('As you approach the wormhole you fear the unknown '
-                           + 'but due to your lack of common sense you still get in '
-                           + 'and after what seems to be an eternity you finally exit from another wormhole.')
+            self._emit('weapon', player, 'You picked up a ' + weapon)
+
+        if content == Content.WORMHOLE:
+            self.set_position(player, self.labyrinth.next_wormhole[pos])
+            self._emit('wormhole', player, 'As you approach the wormhole you fear the unknown '
+                       + 'but due to your lack of common sense you still get in '
+                       + 'and after what seems to be an eternity you finally exit from another wormhole.')
             
-            for p in self.players:
-                if p != player and self.players[p].position == self.players[player].position:
-                    print('You find yourself in the same room as ' + p)
+            for p in self.players_at(self.players[player].position):
+                if p != player: self._emit('meet', player, 'You find yourself in the same room as ' + p)
 
 
-        if content == 'treasure':
+        if content == Content.TREASURE:
             self.players[player].carry = True
-            self.labyrinth.cells[self.players[player].position].content = 'empty'
-            print('You now carry the treasure')
+            self.carriers[player] = None
+            self._check_escape(player)
+            self.labyrinth.set_content(self.players[player].position, Content.EMPTY)
+            self._emit('treasure', player, 'You now carry the treasure')
 
-        if content == 'empty': print('Nothing happens')
+        if content == Content.EMPTY: self._emit('nothing', player, 'Nothing happens')
 
 
+    @timed('game.bear')
     def move_bear_npc(self):
-        """ Move randomly the bear npc player and hurt/move other players if on same case. """
-        while True:
-            direction = choice(['up', 'down', 'left', 'right'])
-
-            if direction == 'up': x_move, y_move = 0, 1
-            if direction == 'down': x_move, y_move = 0, -1
-            if direction == 'left': x_move, y_move = -1, 0
-            if direction == 'right': x_move, y_move = 1, 0
-
-            x, y = self.players['Bear NPC'].position
-            if (x + x_move, y + y_move) in self.labyrinth.cells.keys():
-                if self.labyrinth.junctions[(self.labyrinth.cells[x, y],
-                                             self.labyrinth.cells[x + x_move, y + y_move])] != 'wall':
-                    self.players['Bear NPC'].position = x + x_move, y + y_move
-                    break
-
-            for player in self.players:
-                if player == 'Bear NPC': continue
-                if self.players[player].position == self.players['Bear NPC'].position:
-                    self.player_hit(player, Weapon('Bear paw', 2, 0))
-                    while True:
-                        direction = choice(['up', 'down', 'left', 'right'])
-                        if self.is_move_possible(player, 'move ' + direction): break
-                    self.move_player(player, direction)
+        """ Move the bear npc player, then hurt the other players in its new cell and push them away. """
+        move = self.bear.choose_move()
+        if move is None: return 0
+        position = move[1]
+        self.set_position('Bear NPC', position)
 
+        for player in self.players_at(position):
+            if player == 'Bear NPC' or self.players[player].status == Status.DEAD: continue
+            self.player_hit(player, BEAR_PAW)
+            if self.players[player].status == Status.DEAD: continue
+            self.move_player(player, MOVES[self.rng.choice(self.labyrinth.open_moves[position])[0]])
 
 
     def river_move_player(self, player: Player):
         """ Move a player two cells down the river flow unless if at the end. """
-        idx = 0
-        for cell in self.labyrinth.river:
-            if cell == self.labyrinth.cells[self.players[player].position]: break
-            idx += 1
+        position = self.players[player].position
+        destination = self.labyrinth.river_drift[position]
 
-        if idx == len(self.labyrinth.river) - 1:
+        if destination == position:
             if player == 'Bear NPC': return 0
-            print('The strong current shakes you but you stay in place.')
+            self._emit('river', player, 'The strong current shakes you but you stay in place.')
             return 0
 
-        for i in range(2):
-            if idx < len(self.labyrinth.river) - 1:
-                self.players[player].position = self.labyrinth.river[(idx + 1)].position
-                idx += 1
+        self.set_position(player, destination)
         if player == 'Bear NPC': return 0
-        print('The strong current of the river moves you down stream.')
+        self._emit('river', player, 'The strong current of the river moves you down stream.')
+
+
+    @timed('game.terrain')
+    def resolve_terrain(self, player: Player):
+        """ Apply the effect of the cell of a player at the end of its action.
+
+        A player in the river is moved by the flow, the wormholes are resolved
+        when they are activated with activate_cell.
+        """
+        position = self.players[player].position
+        if position in self.labyrinth.river_drift and self.labyrinth.cells[position].content == Content.RIVER:
+            self.river_move_player(player)
     
 
+    def _is_solo(self):
+        """ Return True if only one player is playing, possibly with the bear NPC. """
+        return len(self.players) == 1 or (len(self.players) == 2 and 'Bear NPC' in self.players)
+
+
     def is_game_over(self):
-        """ Return True if a player has won the game and describe it. """
-        dead_count = 0
-        players_alive = []
-
-        # Check if a player has escaped with the treasure and describes it if so.
-        # Also count dead players.
-        for player in self.players:
-            if self.players[player].position == self.labyrinth.exit_cell.position and self.players[player].carry:
-                reason = player + ' escapes with the treasure and wins!'
-                return True, reason
-            if self.players[player].status == 'dead':
-                dead_count += 1
-            else: players_alive.append(player)
+        """ Return True if a player has escaped with the treasure or is the only one alive.
 
+        The check only reads the counters kept up to date during the game, use
+        game_over_reason to describe it. It used to return the pair (bool, reason),
+        over, reason = game.is_game_over() becoming
+        over, reason = game.is_game_over(), game.game_over_reason().
+        """
+        if self.escaped is not None: return True
         # If only one player is playing then do not consider being the only one left alive as a win
-        if len(self.players) == 1 or (len(self.players) == 2 and 'Bear NPC' in self.players):
-            reason = 'You have to find the treasure and exit!'
-            return False, reason
-
-        # Check if all players but one are dead and describes it if so.
-        if dead_count == len(self.players) - 1:
-            reason = players_alive[0] + ' is the only player alive and wins, congrats you murderer!'
-            return True, reason
-
-        # Describe why the game is not over.
-        reason = ''
-        for i in [len(players_alive) - j for j in range(1, len(players_alive) + 1)]:
-            if i == 1: reason += player + ', and '
-            elif i == 0: reason += player + ' are still alive and no one left the labyrinth with the treasure'
-            else: reason += player + ', '
-        return False, reason
\ No newline at end of file
+        return len(self.alive) == 1 and not self._is_solo()
+
+
+    def game_over_reason(self):
+        """ Return the description of why the game is over or not. """
+        if self.escaped is not None: return self.escaped + ' escapes with the treasure and wins!'
+        if self._is_solo(): return 'You have to find the treasure and exit!'
+
+        players_alive = list(self.alive)
+        if len(players_alive) == 1:
+            return players_alive[0] + ' is the only player alive and wins, congrats you murderer!'
+        if len(players_alive) > 1:
+            players_alive = ', '.join(players_alive[:-1]) + ', and ' + players_alive[-1]
+        else: players_alive = 'No one'
+        return players_alive + ' are still alive and no one left the labyrinth with the treasure'
+
+
+    @timed('game.step')
+    def step(self, player: str, action):
+        """ Play the action of a player and return a StepResult describing what happened.
+
+        The action is one of the actions of commands.py or a command of the game,
+        compiled into an action, if it is not possible nothing is played and the
+        result is not accepted. The bear NPC moves by itself
+        whatever its action. The river flow and the end of the game are resolved
+        after the action.
+        """
+        result = StepResult(player, action)
+        if isinstance(action, str): action = parse_command(action)
+        self._events = result.events
+        try:
+            if player == 'Bear NPC':
+                self.move_bear_npc()
+                action = SKIP
+
+            result.accepted, result.reason = self.is_move_possible(player, action)
+            if not result.accepted:
+                INSTRUMENTS.count('game.rejected_actions')
+                return result
+
+            kind = action.kind
+            if kind == Kind.MOVE: self.move_player(player, action)
+            elif kind == Kind.SHOOT: self.shoot(player, action)
+            elif kind == Kind.ACTIVATE: self.activate_cell(player)
+
+            self.resolve_terrain(player)
+
+            self.game_over = self.is_game_over()
+            if self.game_over:
+                result.game_over = True
+                result.reason = self.game_over_reason()
+                self._emit('game over', None, result.reason)
+        finally:
+            self._events = None
+
+        return result
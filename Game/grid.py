@@ -0,0 +1,243 @@
+""" File containing the array-backed labyrinth object.
+
+It requires numpy, which is optional for the rest of the game.
+"""
+
+
+import copy
+from collections.abc import Mapping
+from random import Random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from cell import Cell, Content
+from instrumentation import INSTRUMENTS
+from junctions import Junctions
+from labyrinth import Labyrinth
+
+
+CONTENTS = tuple(Content)
+
+
+class GridCell(Cell):
+    """ Cell reading and writing its content in the content grid of a labyrinth.
+
+    The grid is a flat buffer of content codes where position (x, y) is at
+    index x * size + y. Two grid cells are equal if they have the same
+    position in the same grid.
+
+    Attributes
+    ----------
+    content: content
+    position: tuple of int
+
+    Methods
+    -------
+    __init__
+    """
+    __slots__ = ('_contents', '_index')
+
+    def __init__(self, contents, position: tuple, index: int):
+        """ Initialize a cell viewing contents at position, stored at index. """
+        self._contents = contents
+        self._index = index
+        self.position = position
+
+
+    @property
+    def content(self):
+        return CONTENTS[self._contents[self._index]]
+
+
+    @content.setter
+    def content(self, content: Content):
+        self._contents[self._index] = content
+
+
+    def __eq__(self, other):
+        if not isinstance(other, GridCell): return NotImplemented
+        return self.position == other.position and self._contents is other._contents
+
+
+    def __hash__(self):
+        return hash(self.position)
+
+
+    def __reduce__(self):
+        return GridCell, (self._contents, self.position, self._index)
+
+
+class CellsView(Mapping):
+    """ Mapping from positions to cells creating the cells on access.
+
+    Methods
+    -------
+    __init__
+    __getitem__
+    __contains__
+    __iter__
+    __len__
+    """
+    def __init__(self, contents, size: int):
+        """ Initialize a view of contents, a flat grid of content codes of a labyrinth of this size. """
+        self._contents = contents
+        self._size = size
+
+
+    def __getitem__(self, position):
+        if position not in self: raise KeyError(position)
+        x, y = position
+        return GridCell(self._contents, position, x * self._size + y)
+
+
+    def __contains__(self, position):
+        try: x, y = position
+        except (TypeError, ValueError): return False
+        return 0 <= x < self._size and 0 <= y < self._size
+
+
+    def __iter__(self):
+        return ((x, y) for x in range(self._size) for y in range(self._size))
+
+
+    def __len__(self):
+        return self._size**2
+
+
+class GridLabyrinth(Labyrinth):
+    """ Make a labyrinth stored in arrays.
+
+    The cell contents are stored as codes in a uint8 grid and the walls in two
+    boolean grids sharing their memory with the junctions, the cells dict being
+    replaced by a view creating cells on access.
+
+    Attributes
+    ----------
+    contents: numpy.ndarray of uint8
+    horizontal_walls: numpy.ndarray of bool
+    vertical_walls: numpy.ndarray of bool
+
+    Methods
+    -------
+    __init__
+    clone
+    set_content
+    """
+    def __init__(self, size: int, nb_player_starters: int, options=None, seed=None, rng=None, progress=None):
+        """ Initialize an array-backed labyrinth, see Labyrinth. """
+        if np is None: raise ImportError('GridLabyrinth requires numpy')
+        if rng is None: rng = Random(seed)
+        self._np_rng = np.random.default_rng(rng.getrandbits(64))
+        super().__init__(size, nb_player_starters, options, rng=rng, progress=progress)
+
+
+    def _init_cells(self, arsenal_p: float):
+
+        self.progress.start('Creating empty labyrinth...')
+        self.contents = np.zeros((self.size, self.size), dtype=np.uint8)
+        self.cells = CellsView(self.contents.reshape(-1), self.size)
+
+        # Make river if option is on.
+        if self.options['river']:
+            with INSTRUMENTS.timer('generation.cells.river'):
+                river = self._make_river()
+                self.contents[tuple(zip(*river))] = Content.RIVER
+                self.river = [self.cells[pos] for pos in river]
+                self.river_positions = set(river)
+
+        self.progress.start('Set up specific cells...')
+        edges = np.ones((self.size, self.size), dtype=bool)
+        edges[1:-1, 1:-1] = False
+
+        with INSTRUMENTS.timer('generation.cells.specials'):
+            self._place(Content.EXIT, 1, edges)
+            self._place(Content.TREASURE, 1)
+            self._place(Content.MAP, 1)
+
+        with INSTRUMENTS.timer('generation.cells.arsenals'):
+            arsenals_nb_min = (self.size - 1)**2 // 4
+            arsenals_nb_max = self.size**2 // 4
+            self._place(Content.ARSENAL, self._np_rng.integers(arsenals_nb_min, arsenals_nb_max + 1))
+
+        if self.options['wormhole']:
+            self.progress.start('Ripping space time appart in some locations...')
+            with INSTRUMENTS.timer('generation.cells.wormholes'):
+                positions = self._place(Content.WORMHOLE, self.size // 2)
+                self.wormholes = [self.cells[pos] for pos in positions]
+
+
+    def _place(self, content: Content, nb: int, mask=None):
+        """ Put content in nb cells sampled among the empty cells allowed by mask.
+
+        Return the positions of the cells, in the order they were sampled.
+        """
+        free = self.contents == Content.EMPTY
+        if mask is not None: free &= mask
+
+        indices = self._np_rng.choice(np.flatnonzero(free), size=min(nb, np.count_nonzero(free)),
+                                      replace=False)
+        self.contents.flat[indices] = content
+
+        return [divmod(int(idx), self.size) for idx in indices]
+
+
+    def _get_exit_cell(self):
+
+        x, y = np.argwhere(self.contents == Content.EXIT)[0]
+        return self.cells[int(x), int(y)]
+
+
+    def _get_treasure_cell(self):
+
+        x, y = np.argwhere(self.contents == Content.TREASURE)[0]
+        return self.cells[int(x), int(y)]
+
+
+    def _init_junctions(self, wall_p: float):
+
+        junctions = self.junctions = Junctions(self.size)
+        self._init_walls()
+
+        land = self.contents != Content.RIVER
+        self.horizontal_walls[:] = (self._np_rng.random(self.horizontal_walls.shape) < wall_p) & land[:-1] & land[1:]
+        self.vertical_walls[:] = (self._np_rng.random(self.vertical_walls.shape) < wall_p) & land[:, :-1] & land[:, 1:]
+
+        return junctions
+
+
+    def _init_walls(self):
+        """ Make the wall grids viewing the junctions arrays. """
+        self.horizontal_walls = np.frombuffer(self.junctions.horizontal, dtype=bool).reshape(self.size - 1, self.size)
+        self.vertical_walls = np.frombuffer(self.junctions.vertical, dtype=bool).reshape(self.size, self.size - 1)
+
+
+    def clone(self):
+        """ Return a copy of the labyrinth with its own content grid, see Labyrinth.clone. """
+        labyrinth = copy.copy(self)
+        labyrinth.contents = self.contents.copy()
+        labyrinth.cells = CellsView(labyrinth.contents.reshape(-1), self.size)
+        labyrinth.river = [labyrinth.cells[cell.position] for cell in self.river]
+        labyrinth.wormholes = [labyrinth.cells[cell.position] for cell in self.wormholes]
+        labyrinth.treasure_cell = labyrinth.cells[self.treasure_cell.position]
+        labyrinth.exit_cell = labyrinth.cells[self.exit_cell.position]
+        return labyrinth
+
+
+    def set_content(self, position: tuple, content: Content):
+        """ Change the content of the cell at position. """
+        self.revision += 1
+        self.contents[position] = content
+
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['horizontal_walls'], state['vertical_walls']
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_walls()
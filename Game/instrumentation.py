@@ -0,0 +1,251 @@
+""" File containing the timers and counters measuring the generation and the game actions.
+
+The phases of the generation and the actions of the games are timed with the
+timers of INSTRUMENTS, which do nothing until it is enabled. The methods timed
+with the timed decorator are only wrapped while it is enabled, so that they
+cost nothing more when it is disabled, e.g.
+
+    INSTRUMENTS.enable()
+    Labyrinth(32, 2)
+    print(INSTRUMENTS.to_prometheus())
+
+or with INSTRUMENTS.recording() as a context manager. It is also enabled
+when the environment variable LABYRINTH_INSTRUMENT is set, each process
+measuring its own instruments.
+Each timer aggregates its durations in a histogram and each counter its
+total, exported as JSON or in the Prometheus text format.
+"""
+
+
+import functools
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+
+# Upper bounds in seconds of the buckets of the histograms
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+           1e-2, 2.5e-2, 5e-2, .1, .25, .5, 1., 2.5, 5., 10.)
+
+NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """ Distribution of durations in the buckets of BUCKETS.
+
+    Attributes
+    ----------
+    counts: list of int
+    count: int
+    sum: float
+    min: float
+    max: float
+
+    Methods
+    -------
+    __init__
+    observe
+    cumulative_counts
+    to_dict
+    """
+    __slots__ = ('counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self):
+        """ Initialize an empty histogram, the last bucket counting the durations above every bound. """
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.
+        self.min = float('inf')
+        self.max = 0.
+
+
+    def observe(self, duration: float):
+        """ Add a duration in seconds. """
+        self.counts[bisect_left(BUCKETS, duration)] += 1
+        self.count += 1
+        self.sum += duration
+        if duration < self.min: self.min = duration
+        if duration > self.max: self.max = duration
+
+
+    def cumulative_counts(self):
+        """ Return the pairs (bound, number of durations up to bound), the last bound being inf. """
+        total = 0
+        pairs = []
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+    def to_dict(self):
+        return {'count': self.count, 'sum': self.sum, 'min': self.min if self.count else None, 'max': self.max,
+                'buckets': {repr(bound): count for bound, count in self.cumulative_counts()}}
+
+
+class Timer:
+    """ Context manager adding the duration of its block to a histogram. """
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class Instrumentation:
+    """ Named timers and counters, doing nothing while disabled.
+
+    Attributes
+    ----------
+    enabled: bool
+    histograms: dict
+    counters: dict
+
+    Methods
+    -------
+    __init__
+    enable
+    disable
+    recording
+    reset
+    instrument
+    timer
+    count
+    to_dict
+    to_json
+    to_prometheus
+    """
+    def __init__(self, enabled=False):
+        """ Initialize instruments without any measure. """
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self._methods = []
+
+
+    def enable(self):
+        """ Start measuring, wrapping the instrumented methods. """
+        self.enabled = True
+        for owner, attribute, function, name in self._methods: setattr(owner, attribute, self._wrap(function, name))
+
+
+    def disable(self):
+        """ Stop measuring, restoring the instrumented methods. """
+        self.enabled = False
+        for owner, attribute, function, name in self._methods: setattr(owner, attribute, function)
+
+
+    @contextmanager
+    def recording(self):
+        """ Enable the instruments in a block, restoring their previous state after it. """
+        enabled = self.enabled
+        self.enable()
+        try: yield self
+        finally:
+            if not enabled: self.disable()
+
+
+    def reset(self):
+        """ Forget every measure. """
+        self.histograms = {}
+        self.counters = {}
+
+
+    def instrument(self, owner, attribute: str, name: str):
+        """ Time the calls of the method attribute of the class owner under name while enabled. """
+        function = getattr(owner, attribute)
+        self._methods.append((owner, attribute, function, name))
+        if self.enabled: setattr(owner, attribute, self._wrap(function, name))
+
+
+    def _wrap(self, function, name: str):
+        """ Return function timing each of its calls under name. """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.timer(name): return function(*args, **kwargs)
+        return wrapper
+
+
+    def timer(self, name: str):
+        """ Return a context manager timing its block under name, doing nothing if disabled. """
+        if not self.enabled: return NULL_TIMER
+        histogram = self.histograms.get(name)
+        if histogram is None: histogram = self.histograms[name] = Histogram()
+        return Timer(histogram)
+
+
+    def count(self, name: str, value=1):
+        """ Add value to the counter name if enabled. """
+        if self.enabled: self.counters[name] = self.counters.get(name, 0) + value
+
+
+    def to_dict(self):
+        return {'timers': {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+                'counters': dict(sorted(self.counters.items()))}
+
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+
+    def to_prometheus(self, prefix='labyrinth'):
+        """ Return the measures in the Prometheus text format.
+
+        The timers are the histogram prefix_phase_seconds labelled by phase
+        and the counters the counter prefix_events_total labelled by event.
+        """
+        lines = []
+        if self.histograms:
+            metric = prefix + '_phase_seconds'
+            lines += ['# HELP {} Duration of the phases of the generation and of the game actions.'.format(metric),
+                      '# TYPE {} histogram'.format(metric)]
+            for name, histogram in sorted(self.histograms.items()):
+                label = 'phase="{}"'.format(_escape(name))
+                for bound, count in histogram.cumulative_counts():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append('{}_bucket{{{},le="{}"}} {}'.format(metric, label, le, count))
+                lines.append('{}_sum{{{}}} {!r}'.format(metric, label, histogram.sum))
+                lines.append('{}_count{{{}}} {}'.format(metric, label, histogram.count))
+
+        if self.counters:
+            metric = prefix + '_events_total'
+            lines += ['# HELP {} Number of events of the generation and of the games.'.format(metric),
+                      '# TYPE {} counter'.format(metric)]
+            for name, value in sorted(self.counters.items()):
+                lines.append('{}{{event="{}"}} {}'.format(metric, _escape(name), value))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str):
+    """ Escape a label value of the Prometheus text format. """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+INSTRUMENTS = Instrumentation(enabled=bool(os.environ.get('LABYRINTH_INSTRUMENT')))
+
+
+def timed(name: str):
+    """ Decorator marking a method to be timed under name, its class being decorated with instrumented. """
+    def decorator(function):
+        function.timer_name = name
+        return function
+    return decorator
+
+
+def instrumented(cls):
+    """ Class decorator registering the methods marked with timed in INSTRUMENTS. """
+    for attribute, value in list(vars(cls).items()):
+        name = getattr(value, 'timer_name', None)
+        if name is not None: INSTRUMENTS.instrument(cls, attribute, name)
+    return cls
@@ -0,0 +1,77 @@
+""" File containing the junctions object. """
+
+
+from cell import Cell
+
+
+class Junctions:
+    """ Store the junctions between adjacent cells of a square labyrinth.
+
+    Only the 2 * size * (size - 1) junctions between adjacent cells are stored,
+    one byte each, in two flat arrays:
+    - horizontal: junction between (x, y) and (x + 1, y) at index x * size + y,
+    - vertical: junction between (x, y) and (x, y + 1) at index x * (size - 1) + y.
+    A junction is read and written with junctions[c1, c2] where c1 and c2 are
+    cells or positions, its value being 'wall' or 'nothing'.
+
+    Attributes
+    ----------
+    size: int
+    horizontal: bytearray
+    vertical: bytearray
+
+    Methods
+    -------
+    __init__
+    __getitem__
+    __setitem__
+    __contains__
+    __len__
+    """
+    def __init__(self, size: int):
+        """ Initialize the junctions of a labyrinth of the given size with no wall. """
+        self.size = size
+        self.horizontal = bytearray(max(size - 1, 0) * size)
+        self.vertical = bytearray(size * max(size - 1, 0))
+
+
+    def _locate(self, key):
+        """ Return the array and the index storing the junction between two cells.
+
+        Raise a KeyError if the cells are not adjacent or outside of the labyrinth.
+        """
+        c1, c2 = key
+        if isinstance(c1, Cell): c1 = c1.position
+        if isinstance(c2, Cell): c2 = c2.position
+        x1, y1 = c1
+        x2, y2 = c2
+        x, y = min(x1, x2), min(y1, y2)
+
+        if 0 <= x and 0 <= y:
+            if y1 == y2 and abs(x2 - x1) == 1 and x2 < self.size and x1 < self.size and y < self.size:
+                return self.horizontal, x * self.size + y
+            if x1 == x2 and abs(y2 - y1) == 1 and y2 < self.size and y1 < self.size and x < self.size:
+                return self.vertical, x * (self.size - 1) + y
+
+        raise KeyError(key)
+
+
+    def __getitem__(self, key):
+        array, idx = self._locate(key)
+        if array[idx]: return 'wall'
+        return 'nothing'
+
+
+    def __setitem__(self, key, value: str):
+        array, idx = self._locate(key)
+        array[idx] = value == 'wall'
+
+
+    def __contains__(self, key):
+        try: self._locate(key)
+        except (KeyError, TypeError, ValueError): return False
+        return True
+
+
+    def __len__(self):
+        return len(self.horizontal) + len(self.vertical)
@@ -1,9 +1,61 @@
 """ File containing the labyrinth object. """
 
 
-from random import random, choice, sample
+import copy
+from array import array
+from collections.abc import Mapping
+from random import Random
 
-from cell import Cell
+from cell import Cell, Content
+from commands import DIRECTIONS, UP, DOWN, LEFT, RIGHT
+from disjoint_set import DisjointSet
+from instrumentation import INSTRUMENTS
+from junctions import Junctions
+from progress import NullProgress
+from renderer import render_labyrinth
+
+
+class CopyOnWriteCells(Mapping):
+    """ Mapping from positions to cells sharing the cells of another mapping until they are modified.
+
+    Methods
+    -------
+    __init__
+    __getitem__
+    own
+    """
+    def __init__(self, cells: Mapping):
+        """ Initialize a mapping sharing the cells of cells. """
+        if isinstance(cells, CopyOnWriteCells): cells = {**cells._shared, **cells._owned}
+        self._shared = cells
+        self._owned = {}
+
+
+    def __getitem__(self, position):
+        cell = self._owned.get(position)
+        if cell is None: return self._shared[position]
+        return cell
+
+
+    def __contains__(self, position):
+        return position in self._shared
+
+
+    def __iter__(self):
+        return iter(self._shared)
+
+
+    def __len__(self):
+        return len(self._shared)
+
+
+    def own(self, position):
+        """ Return the cell at position, copying it first if it is shared. """
+        cell = self._owned.get(position)
+        if cell is None:
+            shared = self._shared[position]
+            cell = self._owned[position] = Cell(shared.content, shared.position)
+        return cell
 
 
 class Labyrinth:
@@ -13,24 +65,52 @@ class Labyrinth:
     ----------
     size: int
     nb_player_starters: int
+    rng: random.Random
+    progress: progress reporter
     cells: dict
+    neighbors: dict
+    interior_neighbors: dict
     treasure_cell: cell
     ext_cell: cell
-    junctions: dict
+    junctions: junctions
+    river: list of cell
+    river_positions: set of tuple
+    wormholes: list of cell
+    fire_ranges: dict
+    river_index: dict
+    river_drift: dict
+    next_wormhole: dict
+    open_moves: dict
+    move_masks: bytearray
+    revision: int
 
     Methods
     -------
     __init__
+    set_content
+    sample_empty_positions
+    init_tables
+    clone
+    map_view
     display_labyrinth
     """
+    # Number of changes made with set_content, used to know when what depends on the contents is outdated
+    revision = 0
 
 
-    def __init__(self, size: int, nb_player_starters: int, options=None):
+    def __init__(self, size: int, nb_player_starters: int, options=None, seed=None, rng=None, progress=None):
         """ Initialize a labyrinth.
         
         Make a square labyrinth of the specified size containing one treasure and one exit.
         The parameter options must be a dictionary if specified.
+        All the random draws are made with rng, a random.Random, or with a generator
+        seeded with seed if rng is not specified, so that the same seed, size and
+        options always give the same labyrinth.
+        The progress of the generation is reported to progress, see progress.py, and
+        nothing is reported if it is not specified.
         """
+        self.progress = progress if progress is not None else NullProgress()
+        self.rng = rng if rng is not None else Random(seed)
         self.size = size
         self.nb_player_starters = nb_player_starters
 
@@ -42,284 +122,379 @@ class Labyrinth:
 
         self.wormholes = []
         self.river = []
-        self._init_cells(.05)
-        self.treasure_cell = self._get_treasure_cell()
-        self.exit_cell = self._get_exit_cell()
-        self.junctions = self._init_junctions(.4)
-        self._open_labyrinth({self.exit_cell.position: self.exit_cell})
-        print(50 * ' ')
+        self.river_positions = set()
+        with INSTRUMENTS.timer('generation'):
+            with INSTRUMENTS.timer('generation.cells'): self._init_cells(.05)
+            self.treasure_cell = self._get_treasure_cell()
+            self.exit_cell = self._get_exit_cell()
+            with INSTRUMENTS.timer('generation.junctions'): self.junctions = self._init_junctions(.4)
+            with INSTRUMENTS.timer('generation.opening'): self._open_labyrinth()
+        self.progress.finish()
+
+
+    def __getattr__(self, name):
+        # The neighbors are indexed on first use, as the generation does not need them,
+        # and the fire ranges once the walls are final.
+        if name in ['neighbors', 'interior_neighbors']:
+            self._init_neighbors()
+            return self.__dict__[name]
+        if name == 'fire_ranges':
+            self._init_fire_ranges()
+            return self.__dict__[name]
+        if name in ['river_index', 'river_drift', 'next_wormhole']:
+            self._init_terrain()
+            return self.__dict__[name]
+        if name == 'open_moves':
+            self._init_open_moves()
+            return self.__dict__[name]
+        if name == 'move_masks':
+            self._init_move_masks()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+
+    def _init_neighbors(self):
+        """ Index the positions adjacent to each position.
+
+        neighbors maps a position to the tuple of its adjacent positions and
+        interior_neighbors to the tuple of those which are not on the edge.
+        """
+        self.neighbors = {}
+        self.interior_neighbors = {}
+        for x in range(self.size):
+            for y in range(self.size):
+                adjacent = tuple((x2, y2) for x2, y2 in [(x, y + 1), (x, y - 1), (x - 1, y), (x + 1, y)]
+                                          if 0 <= x2 < self.size and 0 <= y2 < self.size)
+                self.neighbors[x, y] = adjacent
+                self.interior_neighbors[x, y] = tuple((x2, y2) for x2, y2 in adjacent
+                                                               if 0 < x2 < self.size - 1
+                                                                  and 0 < y2 < self.size - 1)
 
 
     def _init_cells(self, arsenal_p: float):
 
         # Create all cells as empty.
-        print('Creating empty labyrinth...', end='\r')
+        self.progress.start('Creating empty labyrinth...')
         self.cells = {(x, y): Cell(position=(x, y)) for x in range(self.size)
                                                     for y in range(self.size)}
 
-        spec_contents = ['river', 'exit', 'treasure', 'map', 'arsenal', 'wormhole', 'hospital']
-
         # Make river if option is on.
         if self.options['river']:
-            print('Filling up the river...' + 30 * ' ', end='\r')
-            river_size_min = ((self.size - 1)**2 // 4) + 1 
-            river_size_max = self.size**2 // 4
-            river_sizes = list(range(river_size_min - 1, river_size_max + 1))
-            possible_source_cells = [cell for cell in self.cells.values()
-                                          if self._is_edge_cell(cell)
-                                             and not self._is_corner_cell(cell)]
-            river = [choice(possible_source_cells)]
-            while True:
-
-                if len(river) in river_sizes: cell_can_be_edge = True
-                else: cell_can_be_edge = False
-
-                cell = self._choose_next_river_cell(river, cell_can_be_edge=cell_can_be_edge)
-
-                if cell == None or len(river) > river_size_max:
-                    river = [river[0]]
-                    continue
-
-                river.append(cell)
-
-                if cell_can_be_edge and self._is_edge_cell(cell): break
-
-            for c in river: self.cells[c.position].content = 'river'
-            self.river = river
+            with INSTRUMENTS.timer('generation.cells.river'):
+                river = self._make_river()
+                for pos in river: self.cells[pos].content = Content.RIVER
+                self.river = [self.cells[pos] for pos in river]
+                self.river_positions = set(river)
 
         # Let the user know what is happening.
-        print('Set up specific cells...' + 30 * ' ', end='\r')
+        self.progress.start('Set up specific cells...')
 
-        # Set the exit cell..
-        exit_pos = choice([pos for pos, cell in self.cells.items()
-                               if self._is_edge_cell(cell) and
-                                  cell.content not in spec_contents])
-        self.cells[exit_pos].content = 'exit'
+        with INSTRUMENTS.timer('generation.cells.specials'):
+            # Set the exit cell..
+            exit_pos = self.rng.choice([pos for pos, cell in self.cells.items()
+                                   if self._is_edge_cell(cell) and
+                                      cell.content == Content.EMPTY])
+            self.cells[exit_pos].content = Content.EXIT
 
-        # Set the treasure in a cell.
-        treasure_pos = choice([pos for pos, cell in self.cells.items()
-                                   if cell.content not in spec_contents])
-        self.cells[treasure_pos].content = 'treasure'
+            # Set the treasure in a cell.
+            treasure_pos = self.rng.choice([pos for pos, cell in self.cells.items()
+                                       if cell.content == Content.EMPTY])
+            self.cells[treasure_pos].content = Content.TREASURE
 
-        # Set the map cell.
-        map_pos = choice([pos for pos, cell in self.cells.items()
-                              if cell.content not in spec_contents])
-        self.cells[map_pos].content = 'map'
+            # Set the map cell.
+            map_pos = self.rng.choice([pos for pos, cell in self.cells.items()
+                                  if cell.content == Content.EMPTY])
+            self.cells[map_pos].content = Content.MAP
 
         # Set arsenal cells.
-        arsenals_nb_min = (self.size - 1)**2 // 4
-        arsenals_nb_max = self.size**2 // 4
-        arsenal_nb = choice(list(range(arsenals_nb_min, arsenals_nb_max + 1)))
-        for i in range(arsenal_nb):
-            arsenal_pos = choice([pos for pos, cell in self.cells.items()
-                                      if cell.content not in spec_contents])
-            self.cells[arsenal_pos].content = 'arsenal'
+        with INSTRUMENTS.timer('generation.cells.arsenals'):
+            arsenals_nb_min = (self.size - 1)**2 // 4
+            arsenals_nb_max = self.size**2 // 4
+            arsenal_nb = self.rng.randint(arsenals_nb_min, arsenals_nb_max)
+            empty_positions = [pos for pos, cell in self.cells.items() if cell.content == Content.EMPTY]
+            for arsenal_pos in self.rng.sample(empty_positions, k=min(arsenal_nb, len(empty_positions))):
+                self.cells[arsenal_pos].content = Content.ARSENAL
 
         # Set wormholes if option is on.
         if self.options['wormhole']:
-            print('Ripping space time appart in some locations...' + 30 * ' ', end = '\r')
-            nb_wormholes = self.size // 2
-            for i in range(nb_wormholes):
-                content = 'exit'
-                while content in spec_contents:
-                    pos = choice(list(self.cells.keys()))
-                    content = self.cells[pos].content
-                self.cells[pos].content = 'wormhole'
-                self.wormholes.append(self.cells[pos])
-
-
-    def _choose_next_river_cell(self, river: list, cell_can_be_edge=True):
+            self.progress.start('Ripping space time appart in some locations...')
+            with INSTRUMENTS.timer('generation.cells.wormholes'):
+                nb_wormholes = self.size // 2
+                empty_positions = [pos for pos, cell in self.cells.items() if cell.content == Content.EMPTY]
+                for pos in self.rng.sample(empty_positions, k=min(nb_wormholes, len(empty_positions))):
+                    self.cells[pos].content = Content.WORMHOLE
+                    self.wormholes.append(self.cells[pos])
 
-        c0 = river[-1]
-        adjacent_c0 = []
 
-        # Get a list of adjacent cells (with or without edge cells).
-        if cell_can_be_edge:
-            for cell in self.cells.values():
-                if self._are_adjacent_cells(cell, c0): adjacent_c0.append(cell)
-        else:
-            for cell in self.cells.values():
-                if self._are_adjacent_cells(cell, c0) and not self._is_edge_cell(cell):
-                    adjacent_c0.append(cell)
+    def _make_river(self):
+        """ Return the positions of a river flowing from an edge of the labyrinth to another.
 
-        # Randomize the order of the list.
-        adjacent_c0 = sample(adjacent_c0, k=len(adjacent_c0))
-
-        # Ensure that the adjacent cells are not part of the river.
-        for c1 in adjacent_c0:
-
-            adjacent_c1 = []
-            for cell in self.cells.values():
-                if self._are_adjacent_cells(cell, c1): adjacent_c1.append(cell)
-
-            are_river = [cell in river for cell in adjacent_c1
-                                       if cell != c0]
-            if True in are_river: continue
-
-            return c1
-
-        return None
+        The river follows a part of a random path through the cells of odd
+        coordinates, linked by the cells between them so that it never flows
+        next to itself, and it is carved at once without starting over.
+        """
+        self.progress.start('Filling up the river...')
+        size = self.size
+        if size < 4: raise ValueError('The river needs a labyrinth of size 4 at least')
+        m = (size - 1) // 2
+        lengths = [(length - 1) // 2 for length in range((size - 1)**2 // 4, size**2 // 4 + 1)
+                                     if length % 2 and 1 <= (length - 1) // 2 <= m * m]
+
+        # Node i * m + j is the cell (2i + 1, 2j + 1), linked to the edge cells in shores.
+        adjacent = [[i2 * m + j2 for i2, j2 in [(i, j + 1), (i, j - 1), (i - 1, j), (i + 1, j)]
+                                 if 0 <= i2 < m and 0 <= j2 < m] for i in range(m) for j in range(m)]
+        shores = []
+        for i in range(m):
+            for j in range(m):
+                x, y = 2 * i + 1, 2 * j + 1
+                shores.append([pos for pos, is_shore in [((0, y), x == 1), ((x, 0), y == 1),
+                                                         ((size - 1, y), x == size - 2),
+                                                         ((x, size - 1), y == size - 2)] if is_shore])
+
+        # Path visiting every node, snaking through the rows.
+        path = [i * m + (j if i % 2 == 0 else m - 1 - j) for i in range(m) for j in range(m)]
+        while True:
+            # Backbite moves: link an end of the path to one of its neighbors and reverse what follows it.
+            for move in range(len(path) if len(path) > 1 else 0):
+                if self.rng.random() < .5: path.reverse()
+                idx = path.index(self.rng.choice(adjacent[path[-1]]))
+                if idx < len(path) - 2: path[idx + 1:] = path[:idx:-1]
+
+            ends = [idx for idx, node in enumerate(path) if shores[node]]
+            ends_set = set(ends)
+            parts = [(idx, length) for idx in ends for length in lengths
+                                   if idx + length - 1 in ends_set and (length > 1 or len(shores[path[idx]]) > 1)]
+            if parts: break
+
+        idx, length = self.rng.choice(parts)
+        nodes = path[idx:idx + length]
+        if self.rng.random() < .5: nodes.reverse()
+        source = self.rng.choice(shores[nodes[0]])
+        mouth = self.rng.choice([pos for pos in shores[nodes[-1]] if pos != source])
+
+        river = [source]
+        for node, next_node in zip(nodes, nodes[1:]):
+            (i1, j1), (i2, j2) = divmod(node, m), divmod(next_node, m)
+            river += [(2 * i1 + 1, 2 * j1 + 1), (i1 + i2 + 1, j1 + j2 + 1)]
+        i, j = divmod(nodes[-1], m)
+        river += [(2 * i + 1, 2 * j + 1), mouth]
+
+        return river
 
 
     def _get_exit_cell(self):
 
         for cell in self.cells.values():
-            if cell.content == 'exit': return cell
+            if cell.content == Content.EXIT: return cell
 
 
     def _get_treasure_cell(self):
 
         for cell in self.cells.values():
-            if cell.content == 'treasure': return cell
+            if cell.content == Content.TREASURE: return cell
 
 
     def _init_junctions(self, wall_p: float):
 
-        junctions = {(c1, c2): 'nothing' for c1 in self.cells.values()
-                                         for c2 in self.cells.values()
-                                         if c1 != c2}
-        junctions_to_del = []
-        for c1, c2 in junctions.keys():
-            x1, y1 = c1.position
-            x2, y2 = c2.position
+        size = self.size
+        junctions = Junctions(size)
+        for x in range(size):
+            for y in range(size):
+                if (x, y) in self.river_positions: continue
 
-            if abs(x2 - x1) + abs(y2 - y1) == 1:
-                if random() < wall_p and c1 not in self.river and c2 not in self.river:
-                    junctions[c1, c2] = 'wall'
-                    junctions[c2, c1] = junctions[c1, c2]
-            else: junctions_to_del.append((c1, c2))
-
-        for c1, c2 in junctions_to_del: del junctions[c1, c2]
+                if y < size - 1 and (x, y + 1) not in self.river_positions and self.rng.random() < wall_p:
+                    junctions.vertical[x * (size - 1) + y] = 1
+                if x < size - 1 and (x + 1, y) not in self.river_positions and self.rng.random() < wall_p:
+                    junctions.horizontal[x * size + y] = 1
 
         return junctions
 
 
     def _is_edge_cell(self, cell: Cell):
         """ Return True if the cell is on the edge of the labyrinth, False otherwise. """
-        x, y = cell.position
-        if x in [0, self.size - 1] or y in [0, self.size - 1]: return True
-        return False
+        return self._is_edge_position(cell.position)
 
 
     def _is_corner_cell(self, cell: Cell):
         """ Return True if the cell is is a corner of the labyrinth, False otherwise. """
-        x, y = cell.position
+        return self._is_corner_position(cell.position)
+
+
+    def _is_edge_position(self, position: tuple):
+        """ Return True if the position is on the edge of the labyrinth, False otherwise. """
+        x, y = position
+        if x in [0, self.size - 1] or y in [0, self.size - 1]: return True
+        return False
+
+
+    def _is_corner_position(self, position: tuple):
+        """ Return True if the position is is a corner of the labyrinth, False otherwise. """
+        x, y = position
         if x in [0, self.size - 1] and y in [0, self.size - 1]: return True
         return False
 
 
-    def _are_adjacent_cells(self, c1: Cell, c2: Cell):
-        """ Return True if c2 is above, under, left, or right of c1, False otherwise. """
-        x1, y1 = c1.position
-        x2, y2 = c2.position
+    def _open_labyrinth(self):
+        """ Open the minimum number of walls needed to make all cells accessible.
 
-        if abs(x2 - x1) + abs(y2 - y1) == 1: return True
-        return False
+        Cells linked by an open junction are merged in a disjoint set. The flow
+        only carries the players down the river, so the river cells are merged
+        with its last cell, the only one they can be sure to be left from, and
+        the cells next to the other river cells are linked through land only.
+        Walls are then opened in a random order whenever they separate two
+        distinct sets, until a single set remains.
+        """
+        size = self.size
+        horizontal = self.junctions.horizontal
+        vertical = self.junctions.vertical
+        accessible = DisjointSet(size * size)
+
+        # Cells the flow goes through without stopping, which cannot link the cells around them.
+        passing = set(self.river_positions)
+        if self.river:
+            x2, y2 = self.river[-1].position
+            passing.discard((x2, y2))
+            for cell in self.river[:-1]:
+                x1, y1 = cell.position
+                accessible.union(x1 * size + y1, x2 * size + y2)
+
+        walls = []
+        for x in range(size):
+            for y in range(size):
+                if (x, y) in passing: continue
+                idx = x * size + y
+                if y < size - 1 and (x, y + 1) not in passing:
+                    if vertical[x * (size - 1) + y]: walls.append((vertical, x * (size - 1) + y, idx, idx + 1))
+                    else: accessible.union(idx, idx + 1)
+                if x < size - 1 and (x + 1, y) not in passing:
+                    if horizontal[idx]: walls.append((horizontal, idx, idx, idx + size))
+                    else: accessible.union(idx, idx + size)
+
+        nb_openings = accessible.nb_sets - 1
+        self.progress.start('Opening the world...', nb_openings)
+        for walls_array, wall_idx, idx1, idx2 in self.rng.sample(walls, k=len(walls)):
+            if accessible.nb_sets == 1: break
+            if accessible.union(idx1, idx2):
+                walls_array[wall_idx] = 0
+                self.progress.update(nb_openings - accessible.nb_sets + 1)
+        INSTRUMENTS.count('generation.walls_opened', nb_openings - accessible.nb_sets + 1)
+
+
+    def _init_fire_ranges(self):
+        """ Compute the number of cells a bullet can cross from each cell in each direction.
+
+        fire_ranges maps a direction (x_move, y_move) to an array where the
+        number of cells between (x, y) and the first wall or edge is at x * size + y.
+        """
+        size = self.size
+        horizontal = self.junctions.horizontal
+        vertical = self.junctions.vertical
+        up, down, left, right = [array('I', [0]) * size**2 for i in range(4)]
+
+        for x in range(size):
+            for y in range(size - 2, -1, -1):
+                if not vertical[x * (size - 1) + y]: up[x * size + y] = up[x * size + y + 1] + 1
+            for y in range(1, size):
+                if not vertical[x * (size - 1) + y - 1]: down[x * size + y] = down[x * size + y - 1] + 1
+
+        for y in range(size):
+            for x in range(size - 2, -1, -1):
+                if not horizontal[x * size + y]: right[x * size + y] = right[(x + 1) * size + y] + 1
+            for x in range(1, size):
+                if not horizontal[(x - 1) * size + y]: left[x * size + y] = left[(x - 1) * size + y] + 1
+
+        self.fire_ranges = {(0, 1): up, (0, -1): down, (-1, 0): left, (1, 0): right}
+
+
+    def _init_open_moves(self):
+        """ Index the moves possible from each position.
+
+        open_moves maps a position to the tuple of the pairs (direction, position)
+        of the adjacent positions not separated from it by a wall.
+        """
+        size = self.size
+        masks = self.move_masks
+        self.open_moves = {}
+        for x in range(size):
+            for y in range(size):
+                mask = masks[x * size + y]
+                self.open_moves[x, y] = tuple((direction, (x + dx, y + dy))
+                                              for direction, (dx, dy, bit) in DIRECTIONS.items() if mask & bit)
+
+
+    def _init_move_masks(self):
+        """ Compute the directions in which a player can move from each position.
+
+        move_masks has at index x * size + y the flags UP, DOWN, LEFT and RIGHT
+        of commands.py of the directions not blocked by a wall or the edge.
+        """
+        size = self.size
+        horizontal = self.junctions.horizontal
+        vertical = self.junctions.vertical
+        self.move_masks = bytearray(size**2)
+        for x in range(size):
+            for y in range(size):
+                idx = x * size + y
+                mask = 0
+                if y < size - 1 and not vertical[x * (size - 1) + y]: mask |= UP
+                if y > 0 and not vertical[x * (size - 1) + y - 1]: mask |= DOWN
+                if x > 0 and not horizontal[idx - size]: mask |= LEFT
+                if x < size - 1 and not horizontal[idx]: mask |= RIGHT
+                self.move_masks[idx] = mask
+
+
+    def _init_terrain(self):
+        """ Compute the lookup tables of the river and the wormholes.
+
+        river_index maps a river position to its index in the river, river_drift
+        to the position the flow moves a player to, two cells down stream without
+        going further than the mouth, and next_wormhole maps a wormhole position
+        to the position of the wormhole it leads to.
+        """
+        river = [cell.position for cell in self.river]
+        self.river_index = {pos: idx for idx, pos in enumerate(river)}
+        self.river_drift = {pos: river[min(idx + 2, len(river) - 1)] for idx, pos in enumerate(river)}
+
+        wormholes = [cell.position for cell in self.wormholes]
+        self.next_wormhole = {pos: wormholes[(idx + 1) % len(wormholes)] for idx, pos in enumerate(wormholes)}
+
+
+    def set_content(self, position: tuple, content: Content):
+        """ Change the content of the cell at position. """
+        self.revision += 1
+        if isinstance(self.cells, CopyOnWriteCells): self.cells.own(position).content = content
+        else: self.cells[position].content = content
+
+
+    def sample_empty_positions(self, k: int, rng):
+        """ Return k distinct positions of empty cells drawn with rng. """
+        return rng.sample([pos for pos, cell in self.cells.items() if cell.content == Content.EMPTY], k=k)
+
+
+    def init_tables(self):
+        """ Build the tables otherwise built on first use, e.g. before cloning the labyrinth several times. """
+        for name in ['move_masks', 'open_moves', 'fire_ranges', 'river_drift']: getattr(self, name)
+
+
+    def clone(self):
+        """ Return a copy of the labyrinth sharing its cells until they are changed with set_content.
+
+        Everything else than the cells contents is shared as it is not changed once generated,
+        including the tables already built, see init_tables.
+        """
+        labyrinth = copy.copy(self)
+        labyrinth.cells = CopyOnWriteCells(self.cells)
+        return labyrinth
+
+
+    def map_view(self):
+        """ Return the labyrinth shown to a player reading the map, the whole labyrinth. """
+        return self
 
 
-    def _open_labyrinth(self, accessible_cells: dict):
-        """ Find a new accessible cell or open a wall to do so until all cells are accessibles.  """
-        # First we try to find a new 'natural' acessible cell.
-        print('Opening the world...' + 30 * ' ', end='\r')
-
-        cells_to_link = {c.position: c for c in self.cells.values()
-                                       if c.content != 'river' or c == self.river[-1]}
-        new_accessible_cell_found = False
-        for c1 in accessible_cells.values():
-            x1, y1 = c1.position
-
-            for c2 in cells_to_link.values():
-                x2, y2 = c2.position
-
-                if c2 in accessible_cells.values(): continue
-
-                if self._are_adjacent_cells(c1, c2):
-                    if self.junctions[c1, c2] == 'nothing':
-                        accessible_cells[c2.position] = c2
-                        new_accessible_cell_found = True
-                        break
-                    possible_new_cell_junction = c1, c2
-
-            if new_accessible_cell_found: break
-
-        # If we haven't found a new 'natural' accessible cell
-        # then a wall next to an accessible cell is opened.
-        try:
-            if not new_accessible_cell_found:
-                c1, c2 = possible_new_cell_junction
-                self.junctions[c1, c2] = 'nothing'
-                self.junctions[c2, c1] = 'nothing'
-                accessible_cells[c2.position] = c2
-        except:
-            if not new_accessible_cell_found:
-                if self.river[0] in accessible_cells:
-                    for cell in self.river:
-                        accessible_cells[cell.position] = cell
-                else:
-                    # An unlikely event occur that might make the labyrinth unsolvable
-                    # however the probability of it being unsolvable despite the event
-                    # is low enough to be ignored.
-                    return accessible_cells
-
-        if len(accessible_cells) != len(list(cells_to_link.keys())):
-            accessible_cells = self._open_labyrinth(accessible_cells)
-
-        return accessible_cells
-
-
-    def display_labyrinth(self):
-        """ Display the labyrinth in the terminal. """
-        line = '+'
-        for x in range(self.size): line += '+==='
-        line += '++'
-        print(line)
-
-        for y in [self.size - (i + 1) for i in range(self.size)]:
-            line = '||'
-
-            for x in range(self.size):
-                content = self.cells[x, y].content
-
-                if content == 'empty': display_cell = '   '
-                if content == 'exit': display_cell = ' E '
-                if content == 'treasure': display_cell = ' T '
-                if content == 'map': display_cell = ' M '
-                if content == 'wormhole': display_cell = ' W '
-                if content == 'arsenal': display_cell = ' A '
-                if content == 'river':
-                    if self.cells[x, y] == self.river[0]: display_cell = ' R '
-                    else: display_cell = ' ≈ '
-
-                line += display_cell
-
-                if x < self.size - 1:
-                    c1 = self.cells[x, y]
-                    c2 = self.cells[x + 1, y]
-                    if self.junctions[c1, c2] == 'nothing': display_junction = ' '
-                    if self.junctions[c1, c2] == 'wall': display_junction = '|'
-                    line += display_junction
-
-                if x == self.size - 1: line += '||'
-
-            print(line)
-
-            if y > 0:
-                line = '+'
-                for x in range(self.size):
-                    c1 = self.cells[x, y]
-                    c2 = self.cells[x, y - 1]
-                    if self.junctions[c1, c2] == 'nothing': display_junction = '+   '
-                    if self.junctions[c1, c2] == 'wall': display_junction = '+---'
-                    line += display_junction
-
-                line += '++'
-                print(line)
-
-            if y == 0:
-                line = '+'
-                for x in range(self.size): line += '+==='
-                line += '++'
-                print(line)
+    def display_labyrinth(self, output=print):
+        """ Display the labyrinth in the terminal, or send it to output if specified. """
+        output(render_labyrinth(self))
 
 
     def display_legend(self):
@@ -1,9 +1,12 @@
 """ File containing the main function and running the game. """
 
 
+from commands import Kind, SKIP, parse_command
 from labyrinth import Labyrinth
-from player import Player
+from player import Player, Status
 from game import Game
+from progress import TerminalProgress
+from renderer import Renderer
 
 
 def play_game_labyrinth():
@@ -17,62 +20,43 @@ def play_game_labyrinth():
         if size == 4 and len(players) > 4: print('The labyrinth size is too small for the number of players.')
         else: break
     options = get_options()
-    game = Game(Labyrinth(size, len(players), options), players)
+    renderer = Renderer(diff=True)
+    game = Game(Labyrinth(size, len(players), options, progress=TerminalProgress()), players,
+                output=renderer.write, renderer=renderer)
     if options['bear']: game.players['Bear NPC'] = Player()
     game.randomly_place_players()
     game.display_rules()
-    game.labyrinth.display_labyrinth()
+    renderer.draw(game.labyrinth)
 
     while not game.game_over:
         for player in game.players:
 
-            if game.players[player].status == 'dead': continue
+            if game.players[player].status == Status.DEAD: continue
 
-            if player == 'Bear NPC':
-                game.move_bear_npc()
-                move = 'skip'
-            else: move = get_player_move(player)
-            
-            move_possible, reason = game.is_move_possible(player, move)
-            while not move_possible:
-                print(reason)
+            if player == 'Bear NPC': action = SKIP
+            else: action = get_player_move(player)
+            # The input was echoed in the terminal, below the last frame
+            renderer.reset()
 
-                if move == 'exit':
+            result = game.step(player, action)
+            while not result.accepted:
+                renderer.write(result.reason)
+
+                if action.kind == Kind.EXIT:
                     answer = input('Are you sure you want to quit the game? [y/n] ').lower()
                     if answer in ['y', 'yes']: return 0
                     print('That is right, never give up!')
 
-                move = get_player_move(player)
-                move_possible, reason = game.is_move_possible(player, move)
-
-            if move == 'skip': pass
-
-            if move in ['move up', 'move down', 'move left', 'move right']:
-                direction = move[5:]
-                game.move_player(player, direction)
-            if move in ['w', 's', 'a', 'd']:
-                direction = move
-                game.move_player(player, direction)
-
-            if move in ['shoot up', 'shoot down', 'shoot left', 'shoot right']:
-                direction = move[6:]
-                game.shoot(player, direction)
+                action = get_player_move(player)
+                renderer.reset()
+                result = game.step(player, action)
 
-            if move == 'activate cell' or move == 'e':
-                game.activate_cell(player)
-
-            if game.labyrinth.cells[game.players[player].position].content == 'river':
-                game.river_move_player(player)
-
-            game.game_over, reason = game.is_game_over()
-            if game.game_over:
-                print(reason)
-                break
+            if game.game_over: break
 
         if not game.game_over: game.turn += 1
 
-    print('\nLabyrinth: finished in {} turns.'.format(game.turn))
-    game.labyrinth.display_labyrinth()
+    renderer.write('\nLabyrinth: finished in {} turns.'.format(game.turn))
+    renderer.draw(game.labyrinth)
     game.labyrinth.display_legend()
 
 
@@ -146,17 +130,12 @@ def get_options():
 def get_player_move(player):
     """ Get player move via the user.
 
-    The move must be one of the known moves.
+    The move must be one of the known moves, it is returned compiled into an action.
     """
-    known_moves = ['move up', 'move down', 'move left', 'move right', 'w', 's', 'a', 'd',
-                   'shoot up', 'shoot down', 'shoot left', 'shoot right',
-                   'activate cell', 'e',
-                   'exit',
-                   'skip']
-    move = input(player + ': ').lower()
-    while move not in known_moves: move = input('Command unkown.\n' + player + ': ').lower()
-    
-    return move
+    action = parse_command(input(player + ': '))
+    while action is None: action = parse_command(input('Command unkown.\n' + player + ': '))
+
+    return action
 
 
 if __name__ == '__main__':
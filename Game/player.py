@@ -1,15 +1,27 @@
 """ File containing the player object. """
 
 
+from enum import IntEnum
+
 from weapon import Weapon
 
 
+class Status(IntEnum):
+	""" Codes of the possible statuses of a player. """
+	HEALTHY = 0
+	WOUNDED = 1
+	DEAD = 2
+
+	def __str__(self):
+		return self.name.lower()
+
+
 class Player:
 	""" Player object. 
 
 	Attributes
 	----------
-	status: str
+	status: status
 	position: tuple of int
 	carry: bool
 	weapon: weapon
@@ -18,9 +30,11 @@ class Player:
 	-------
 	__init__
 	"""
-	def __init__(self, position=None, status='healthy', weapon=None, carry=False):
+	__slots__ = ('status', 'weapon', 'carry', 'position')
+
+	def __init__(self, position=None, status=Status.HEALTHY, weapon=None, carry=False):
 		""" Initialize a player. """
 		self.status = status
 		self.weapon = weapon
 		self.carry = carry
-		self.position = position
\ No newline at end of file
+		self.position = position
@@ -0,0 +1,86 @@
+""" File containing the objects reporting the progress of the labyrinth generation. """
+
+
+import sys
+import time
+
+
+class NullProgress:
+    """ Progress reporter ignoring everything, used by default.
+
+    A progress reporter is told when a stage starts with start, how much of
+    it is done with update, and when everything is done with finish.
+
+    Methods
+    -------
+    start
+    update
+    finish
+    """
+    def start(self, stage: str, total=None):
+        """ Start a stage of total steps, unknown if not specified. """
+        pass
+
+
+    def update(self, done: int):
+        """ Tell that done steps of the current stage are done. """
+        pass
+
+
+    def finish(self):
+        """ Tell that everything is done. """
+        pass
+
+
+class TerminalProgress(NullProgress):
+    """ Progress reporter writing the current stage on a single line of a stream.
+
+    The line is written when a stage starts and at most once every interval
+    seconds when it progresses, so that reporting costs almost nothing however
+    many steps there are.
+
+    Attributes
+    ----------
+    stream: file-like object
+    interval: float
+
+    Methods
+    -------
+    __init__
+    start
+    update
+    finish
+    """
+    def __init__(self, stream=None, interval=.1):
+        """ Initialize a reporter writing in stream, the standard output if not specified. """
+        self.stream = stream
+        self.interval = interval
+        self._stage = ''
+        self._total = None
+        self._last_write = 0.
+        self._width = 0
+
+
+    def _write(self, text: str, end=''):
+        """ Write text over the current line. """
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write('\r' + text.ljust(self._width) + end)
+        stream.flush()
+        self._width = len(text)
+        self._last_write = time.monotonic()
+
+
+    def start(self, stage: str, total=None):
+        self._stage = stage
+        self._total = total
+        self._write(stage)
+
+
+    def update(self, done: int):
+        if time.monotonic() - self._last_write < self.interval: return
+        if self._total: self._write('{} {:.0%}'.format(self._stage, done / self._total))
+        else: self._write('{} {}'.format(self._stage, done))
+
+
+    def finish(self):
+        self._write('', end='\r')
@@ -0,0 +1,123 @@
+""" File containing the functions and the object drawing labyrinths in the terminal. """
+
+
+import sys
+
+from cell import Content
+
+
+CELL_GLYPHS = {Content.EMPTY: '   ',
+               Content.RIVER: ' ≈ ',
+               Content.EXIT: ' E ',
+               Content.TREASURE: ' T ',
+               Content.MAP: ' M ',
+               Content.ARSENAL: ' A ',
+               Content.WORMHOLE: ' W ',
+               Content.HOSPITAL: ' H '}
+SOURCE_GLYPH = ' R '
+GLYPHS = tuple(CELL_GLYPHS[content] for content in Content)
+SIDE_GLYPHS = (' ', '|')
+FLOOR_GLYPHS = ('+   ', '+---')
+
+
+def _get_codes(labyrinth):
+    """ Return the content codes of the cells of a labyrinth, (x, y) being at x * size + y. """
+    contents = getattr(labyrinth, 'contents', None)
+    if contents is not None: return bytes(contents)
+    return [labyrinth.cells[x, y].content for x in range(labyrinth.size)
+                                          for y in range(labyrinth.size)]
+
+
+def render_rows(labyrinth):
+    """ Return the list of the text lines representing a labyrinth. """
+    size = labyrinth.size
+    codes = _get_codes(labyrinth)
+    horizontal = labyrinth.junctions.horizontal
+    vertical = labyrinth.junctions.vertical
+    source = -1
+    if labyrinth.river:
+        x, y = labyrinth.river[0].position
+        source = x * size + y
+
+    border = '+' + size * '+===' + '++'
+    rows = [border]
+    for y in range(size - 1, -1, -1):
+        line = ['||']
+        for x in range(size):
+            idx = x * size + y
+            line.append(SOURCE_GLYPH if idx == source and codes[idx] == Content.RIVER else GLYPHS[codes[idx]])
+            if x < size - 1: line.append(SIDE_GLYPHS[horizontal[idx]])
+        line.append('||')
+        rows.append(''.join(line))
+
+        if y > 0:
+            rows.append('+' + ''.join([FLOOR_GLYPHS[vertical[x * (size - 1) + y - 1]]
+                                       for x in range(size)]) + '++')
+    rows.append(border)
+
+    return rows
+
+
+def render_labyrinth(labyrinth):
+    """ Return the text representing a labyrinth as a single string. """
+    return '\n'.join(render_rows(labyrinth))
+
+
+class Renderer:
+    """ Draw labyrinths in a stream with a single write per frame.
+
+    In diff mode the frame is drawn once and the next frames only redraw the
+    lines which changed, moving the cursor up with ANSI escape sequences. This
+    is only done when nothing else was written in the stream since the last
+    frame: the messages written with write, e.g. by a game using it as output,
+    make the next frame be drawn entirely, and anything else writing in the
+    stream must call reset.
+
+    Attributes
+    ----------
+    stream: file-like object
+    diff: bool
+
+    Methods
+    -------
+    __init__
+    draw
+    write
+    reset
+    """
+    def __init__(self, stream=None, diff=False):
+        """ Initialize a renderer writing in stream, the standard output if not specified. """
+        self.stream = stream
+        self.diff = diff
+        self._rows = None
+
+
+    def draw(self, labyrinth):
+        """ Write the frame of a labyrinth, or the lines changed since the last frame in diff mode. """
+        rows = render_rows(labyrinth)
+        stream = self.stream if self.stream is not None else sys.stdout
+
+        if self.diff and self._rows is not None and len(rows) == len(self._rows):
+            nb_rows = len(rows)
+            text = ''.join(['\x1b[{0}F{1}\x1b[K\x1b[{0}E'.format(nb_rows - i, row)
+                            for i, (row, last_row) in enumerate(zip(rows, self._rows))
+                            if row != last_row])
+        else: text = '\n'.join(rows) + '\n'
+
+        if text:
+            stream.write(text)
+            stream.flush()
+        self._rows = rows
+
+
+    def write(self, message: str):
+        """ Write a message on its own line, the next frame being drawn entirely. """
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(str(message) + '\n')
+        stream.flush()
+        self._rows = None
+
+
+    def reset(self):
+        """ Forget the last frame so that the next one is drawn entirely. """
+        self._rows = None
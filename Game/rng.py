@@ -0,0 +1,16 @@
+""" File containing the helpers making the random number generators. """
+
+
+from random import Random
+
+
+def fork_rng(seed, *labels):
+    """ Return a random number generator specific to a seed and some labels.
+
+    The generator is seeded from a string made of the seed and the labels, which
+    gives the same stream in every process and independent streams for different
+    labels, e.g. fork_rng(seed, 'labyrinth') and fork_rng(seed, 'game').
+    If the seed is None the generator is seeded from the system.
+    """
+    if seed is None: return Random()
+    return Random(':'.join(str(value) for value in (seed,) + labels))
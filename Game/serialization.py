@@ -0,0 +1,342 @@
+""" File containing the compact binary format of labyrinths and games.
+
+A labyrinth record is made of, all integers being little-endian:
+- a header: magic b'LABY', version (uint8), size (uint16), number of player
+  starters (uint16), options flags (uint8), river length (uint32) and number
+  of wormholes (uint32),
+- the content codes of the cells, one byte per cell, (x, y) at x * size + y,
+- the horizontal then the vertical walls, one bit per junction in the order
+  of the Junctions arrays, each padded to a whole number of bytes,
+- the river cells from source to mouth then the wormholes in the order they
+  lead to each other, as uint32 indexes x * size + y.
+
+A game record is made of a header: magic b'GAME', version (uint8), turn
+(uint32), game over (uint8) and number of players (uint16), followed by a
+labyrinth record and by the players, each one being: name length (uint8),
+name (utf-8), x (uint16), y (uint16), status (uint8), weapon code (uint8)
+and carry (uint8), x and y being UNPLACED for a player not placed yet.
+
+Files store a sequence of records, each one preceded by its length (uint32).
+"""
+
+
+import copy
+import mmap
+import struct
+import sys
+from array import array
+
+from cell import Content
+from game import Game
+from grid import CellsView
+from junctions import Junctions
+from labyrinth import Labyrinth
+from player import Player, Status
+from weapon import PISTOL, SHOTGUN, BEAR_PAW
+
+
+VERSION = 1
+LABYRINTH_HEADER = struct.Struct('<4sBHHBII')
+GAME_HEADER = struct.Struct('<4sBIBH')
+PLAYER_RECORD = struct.Struct('<HHBBB')
+RECORD_LENGTH = struct.Struct('<I')
+
+# Coordinates of the players without position, beyond the largest size
+UNPLACED = 0xFFFF
+
+OPTIONS = ['wormhole', 'river', 'bear', 'hospital']
+WEAPONS = [None, PISTOL, SHOTGUN, BEAR_PAW]
+
+_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+_FROM_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def _pack_bits(flags) -> bytes:
+    """ Return the flags, bytes equal to 0 or 1, packed as bits. """
+    if not flags: return b''
+    return int(bytes(flags).translate(_TO_DIGITS), 2).to_bytes((len(flags) + 7) // 8, 'big')
+
+
+def _unpack_bits(data, nb: int) -> bytearray:
+    """ Return nb flags, bytes equal to 0 or 1, unpacked from bits. """
+    if not nb: return bytearray()
+    return bytearray(format(int.from_bytes(data, 'big'), '0{}b'.format(nb)).encode().translate(_FROM_DIGITS))
+
+
+def _get_contents(labyrinth: Labyrinth) -> bytes:
+    """ Return the content codes of the cells of a labyrinth. """
+    contents = getattr(labyrinth, 'contents', None)
+    if contents is not None: return bytes(contents)
+    return bytes(labyrinth.cells[x, y].content for x in range(labyrinth.size)
+                                               for y in range(labyrinth.size))
+
+
+def _get_indexes(labyrinth: Labyrinth):
+    """ Return the indexes of the river cells and of the wormholes as little-endian arrays. """
+    size = labyrinth.size
+    river = array('I', [x * size + y for x, y in (cell.position for cell in labyrinth.river)])
+    wormholes = array('I', [x * size + y for x, y in (cell.position for cell in labyrinth.wormholes)])
+    if sys.byteorder == 'big':
+        river.byteswap()
+        wormholes.byteswap()
+    return river, wormholes
+
+
+def record_size(labyrinth: Labyrinth) -> int:
+    """ Return the length of the record of a labyrinth. """
+    size = labyrinth.size
+    return (LABYRINTH_HEADER.size + size**2 + 2 * ((size * (size - 1) + 7) // 8)
+            + 4 * (len(labyrinth.river) + len(labyrinth.wormholes)))
+
+
+def dump_labyrinth(labyrinth: Labyrinth) -> bytes:
+    """ Return the record of a labyrinth. """
+    options = sum(1 << i for i, opt in enumerate(OPTIONS) if labyrinth.options.get(opt))
+    river, wormholes = _get_indexes(labyrinth)
+
+    return b''.join([LABYRINTH_HEADER.pack(b'LABY', VERSION, labyrinth.size, labyrinth.nb_player_starters,
+                                           options, len(river), len(wormholes)),
+                     _get_contents(labyrinth),
+                     _pack_bits(labyrinth.junctions.horizontal),
+                     _pack_bits(labyrinth.junctions.vertical),
+                     river.tobytes(),
+                     wormholes.tobytes()])
+
+
+def dump_labyrinth_into(labyrinth: Labyrinth, buffer, offset=0) -> int:
+    """ Write the record of a labyrinth in buffer at offset and return the offset following it.
+
+    The buffer must be writable, e.g. a bytearray, and long enough, see record_size.
+    """
+    options = sum(1 << i for i, opt in enumerate(OPTIONS) if labyrinth.options.get(opt))
+    river, wormholes = _get_indexes(labyrinth)
+    LABYRINTH_HEADER.pack_into(buffer, offset, b'LABY', VERSION, labyrinth.size, labyrinth.nb_player_starters,
+                               options, len(river), len(wormholes))
+    offset += LABYRINTH_HEADER.size
+
+    for data in [_get_contents(labyrinth),
+                 _pack_bits(labyrinth.junctions.horizontal),
+                 _pack_bits(labyrinth.junctions.vertical),
+                 river,
+                 wormholes]:
+        data = memoryview(data).cast('B')
+        buffer[offset:offset + len(data)] = data
+        offset += len(data)
+
+    return offset
+
+
+class LoadedLabyrinth(Labyrinth):
+    """ Labyrinth loaded from a record, its content codes being stored in a bytearray viewed by its cells.
+
+    Attributes
+    ----------
+    contents: bytearray
+
+    Methods
+    -------
+    clone
+    """
+    def clone(self):
+        """ Return a copy of the labyrinth with its own content codes, see Labyrinth.clone. """
+        labyrinth = copy.copy(self)
+        labyrinth.contents = bytearray(self.contents)
+        labyrinth.cells = CellsView(labyrinth.contents, self.size)
+        labyrinth.river = [labyrinth.cells[cell.position] for cell in self.river]
+        labyrinth.wormholes = [labyrinth.cells[cell.position] for cell in self.wormholes]
+        if self.treasure_cell is not None: labyrinth.treasure_cell = labyrinth.cells[self.treasure_cell.position]
+        if self.exit_cell is not None: labyrinth.exit_cell = labyrinth.cells[self.exit_cell.position]
+        return labyrinth
+
+
+def load_labyrinth(buffer, offset=0):
+    """ Return the labyrinth stored in buffer at offset and the offset following its record.
+
+    The buffer can be bytes, a memoryview or a mmap. The content codes are
+    copied in a bytearray viewed by the cells instead of making one object
+    per cell.
+    """
+    buffer = memoryview(buffer)
+    magic, version, size, nb_player_starters, options, river_nb, wormholes_nb = \
+        LABYRINTH_HEADER.unpack_from(buffer, offset)
+    if magic != b'LABY' or version != VERSION:
+        raise ValueError('Not a labyrinth record of version {}'.format(VERSION))
+    offset += LABYRINTH_HEADER.size
+
+    labyrinth = LoadedLabyrinth.__new__(LoadedLabyrinth)
+    labyrinth.rng = None
+    labyrinth.size = size
+    labyrinth.nb_player_starters = nb_player_starters
+    labyrinth.options = {opt: bool(options >> i & 1) for i, opt in enumerate(OPTIONS)}
+
+    labyrinth.contents = bytearray(buffer[offset:offset + size**2])
+    labyrinth.cells = CellsView(labyrinth.contents, size)
+    offset += size**2
+
+    junctions = labyrinth.junctions = Junctions(size)
+    for walls in [junctions.horizontal, junctions.vertical]:
+        nb_bytes = (len(walls) + 7) // 8
+        walls[:] = _unpack_bits(buffer[offset:offset + nb_bytes], len(walls))
+        offset += nb_bytes
+
+    positions = []
+    for nb in [river_nb, wormholes_nb]:
+        indexes = array('I', bytes(buffer[offset:offset + 4 * nb]))
+        if sys.byteorder == 'big': indexes.byteswap()
+        positions.append([divmod(idx, size) for idx in indexes])
+        offset += 4 * nb
+    labyrinth.river = [labyrinth.cells[pos] for pos in positions[0]]
+    labyrinth.river_positions = set(positions[0])
+    labyrinth.wormholes = [labyrinth.cells[pos] for pos in positions[1]]
+
+    labyrinth.treasure_cell = labyrinth.exit_cell = None
+    treasure_idx = labyrinth.contents.find(Content.TREASURE)
+    if treasure_idx >= 0: labyrinth.treasure_cell = labyrinth.cells[divmod(treasure_idx, size)]
+    exit_idx = labyrinth.contents.find(Content.EXIT)
+    if exit_idx >= 0: labyrinth.exit_cell = labyrinth.cells[divmod(exit_idx, size)]
+
+    return labyrinth, offset
+
+
+def dump_game(game: Game) -> bytes:
+    """ Return the record of a game. """
+    records = [GAME_HEADER.pack(b'GAME', VERSION, game.turn, game.game_over, len(game.players)),
+               dump_labyrinth(game.labyrinth)]
+    for name, player in game.players.items():
+        name = name.encode()
+        x, y = player.position if player.position is not None else (UNPLACED, UNPLACED)
+        records.append(bytes([len(name)]) + name)
+        records.append(PLAYER_RECORD.pack(x, y, player.status, WEAPONS.index(player.weapon), player.carry))
+
+    return b''.join(records)
+
+
+def load_game(buffer, offset=0, output=None):
+    """ Return the game stored in buffer at offset and the offset following its record. """
+    buffer = memoryview(buffer)
+    magic, version, turn, game_over, nb_players = GAME_HEADER.unpack_from(buffer, offset)
+    if magic != b'GAME' or version != VERSION:
+        raise ValueError('Not a game record of version {}'.format(VERSION))
+    labyrinth, offset = load_labyrinth(buffer, offset + GAME_HEADER.size)
+
+    players = {}
+    for i in range(nb_players):
+        name_length = buffer[offset]
+        name = bytes(buffer[offset + 1:offset + 1 + name_length]).decode()
+        offset += 1 + name_length
+        x, y, status, weapon, carry = PLAYER_RECORD.unpack_from(buffer, offset)
+        offset += PLAYER_RECORD.size
+        position = (x, y) if (x, y) != (UNPLACED, UNPLACED) else None
+        players[name] = Player(position, Status(status), WEAPONS[weapon], bool(carry))
+
+    game = Game(labyrinth, players, output=output)
+    game.turn = turn
+    game.game_over = bool(game_over)
+
+    return game, offset
+
+
+def save_records(path: str, records, append=False):
+    """ Write records, e.g. made by dump_labyrinth, in a file each one preceded by its length. """
+    with open(path, 'ab' if append else 'wb') as file:
+        for record in records:
+            file.write(RECORD_LENGTH.pack(len(record)))
+            file.write(record)
+
+
+def iter_records(size: int, nb_player_starters: int, options=None, seeds=range(100), labyrinth_class=Labyrinth):
+    """ Generate the labyrinth of each seed and yield its record.
+
+    The records are memoryviews of a buffer written again for the next labyrinth,
+    they must be copied, e.g. with bytes, to be kept. Only one labyrinth is kept
+    in memory at a time, chain several iterators to generate boards with several
+    options.
+    """
+    buffer = bytearray()
+    for seed in seeds:
+        labyrinth = labyrinth_class(size, nb_player_starters, options, seed=seed)
+        length = record_size(labyrinth)
+        # A larger buffer is made instead of resizing it as the last record may still be viewed
+        if length > len(buffer): buffer = bytearray(length)
+        dump_labyrinth_into(labyrinth, buffer)
+        yield memoryview(buffer)[:length]
+
+
+def write_records(path: str, records, append=False, chunk_size=2**20):
+    """ Write records in a file in the format of save_records, by chunks of chunk_size bytes.
+
+    The records are copied in a chunk buffer written when full, so that records
+    viewing a reused buffer, as yielded by iter_records, can be written without
+    being kept. Return the number of records written.
+    """
+    chunk = bytearray(chunk_size)
+    offset = nb = 0
+    with open(path, 'ab' if append else 'wb') as file:
+        for record in records:
+            length = RECORD_LENGTH.size + len(record)
+            if offset + length > chunk_size:
+                file.write(memoryview(chunk)[:offset])
+                offset = 0
+            if length > chunk_size:
+                file.write(RECORD_LENGTH.pack(len(record)))
+                file.write(record)
+            else:
+                RECORD_LENGTH.pack_into(chunk, offset, len(record))
+                chunk[offset + RECORD_LENGTH.size:offset + length] = record
+                offset += length
+            nb += 1
+        file.write(memoryview(chunk)[:offset])
+
+    return nb
+
+
+class LabyrinthArchive:
+    """ File of labyrinth records read through a memory map.
+
+    The offsets of the records are found when the file is opened, any labyrinth
+    can then be loaded directly with archive[i].
+
+    Attributes
+    ----------
+    offsets: list of int
+
+    Methods
+    -------
+    __init__
+    __getitem__
+    __len__
+    close
+    """
+    def __init__(self, path: str):
+        """ Open the file at path and find the offsets of its records. """
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = []
+
+        offset = 0
+        while offset < len(self._map):
+            length, = RECORD_LENGTH.unpack_from(self._map, offset)
+            self.offsets.append(offset + RECORD_LENGTH.size)
+            offset += RECORD_LENGTH.size + length
+
+
+    def __getitem__(self, i: int):
+        return load_labyrinth(self._map, self.offsets[i])[0]
+
+
+    def __len__(self):
+        return len(self.offsets)
+
+
+    def close(self):
+        """ Close the memory map and the file. """
+        self._map.close()
+        self._file.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,388 @@
+""" File containing the server hosting games played over TCP.
+
+Run this file to start a server. Players connect with any line based client,
+e.g. nc localhost 8765, and send one command per line:
+- name <name>: choose the name of the player, required before playing,
+- play [players] [size] [options]: wait for a game of players players in a
+  labyrinth of size, with the options separated by a comma, e.g. play 2 8 river,
+- the commands of the game, see main.get_player_move, during its turn,
+- leave: stop waiting for a game or leave the current game,
+- help: list the commands,
+- quit: close the connection.
+
+The server answers with lines starting with a keyword:
+- ok <text>: the command was done,
+- error <text>: the command was refused,
+- wait <players>/<players needed>: number of players waiting for the game,
+- start <players separated by a comma>: the game started,
+- msg <text>: message of the game, sent to all its players,
+- turn <player>: it is the turn of player,
+- over <reason>: the game is over.
+
+Each game is played turn by turn, a player which does not play within the
+turn timeout skips its turn, as the players which left the game.
+"""
+
+
+import asyncio
+
+from commands import COMMANDS, Action, parse_command
+from game import Game
+from labyrinth import Labyrinth
+from player import Player, Status
+
+
+OPTIONS = ['wormhole', 'river', 'bear', 'hospital']
+
+
+class Session:
+    """ Connection of a player to the server.
+
+    Attributes
+    ----------
+    name: str or None
+    table: table or None
+    waiting: tuple or None
+    starting: bool
+    leaving: bool
+
+    Methods
+    -------
+    __init__
+    send
+    close
+    """
+    __slots__ = ('writer', 'name', 'table', 'waiting', 'starting', 'leaving')
+
+    # Size of the data not sent yet above which the client is considered too slow and disconnected
+    max_buffer_size = 2**20
+
+    def __init__(self, writer):
+        """ Initialize the session of a connection writing in writer. """
+        self.writer = writer
+        self.name = None
+        self.table = None
+        self.waiting = None
+        # The game of the player is being started, it asked to leave it if leaving
+        self.starting = False
+        self.leaving = False
+
+
+    def send(self, keyword: str, text=''):
+        """ Send a line to the player without waiting for it to be sent. """
+        if self.writer.is_closing(): return
+        for line in str(text).split('\n') if text else ['']:
+            self.writer.write((keyword + ' ' + line).rstrip().encode() + b'\n')
+        if self.writer.transport.get_write_buffer_size() > self.max_buffer_size: self.close()
+
+
+    def close(self):
+        """ Close the connection. """
+        if not self.writer.is_closing(): self.writer.close()
+
+
+class Table:
+    """ Game played by connected players.
+
+    The turns are played in the order of the players, the bear NPC and the
+    players which left the game skipping their turn. The turn of a connected
+    player is skipped if it does not play within turn_timeout seconds.
+
+    Attributes
+    ----------
+    game: game
+    sessions: dict
+    turn_timeout: float
+
+    Methods
+    -------
+    __init__
+    start
+    play
+    leave
+    """
+    def __init__(self, sessions: list, labyrinth: Labyrinth, options: dict, turn_timeout: float):
+        """ Initialize a game of the players of sessions in labyrinth. """
+        self.sessions = {session.name: session for session in sessions}
+        self.turn_timeout = turn_timeout
+        self.game = Game(labyrinth, {session.name: Player() for session in sessions}, output=self.broadcast)
+        if options.get('bear'): self.game.players['Bear NPC'] = Player()
+        self.game.randomly_place_players()
+        self._order = list(self.game.players)
+        self._index = -1
+        self._deadline = None
+        for session in sessions: session.table = self
+
+
+    def broadcast(self, message: str, keyword='msg'):
+        """ Send a message to all the players connected to the game. """
+        for session in self.sessions.values(): session.send(keyword, message)
+
+
+    def start(self):
+        """ Describe the game and start the first turn. """
+        self.broadcast(', '.join(self._order), 'start')
+        self.game.display_rules()
+        self.game.labyrinth.display_labyrinth(self.broadcast)
+        self._next_turn()
+
+
+    def _current_player(self):
+        return self._order[self._index] if not self.game.game_over else None
+
+
+    def _next_turn(self):
+        """ Play the turns skipped until the turn of a connected player, and start it. """
+        if self._deadline is not None: self._deadline.cancel()
+        game = self.game
+
+        while not game.game_over:
+            if not self.sessions: return self._finish('Every player left the game')
+            self._index += 1
+            if self._index == len(self._order):
+                self._index = 0
+                game.turn += 1
+
+            player = self._order[self._index]
+            if game.players[player].status == Status.DEAD: continue
+            if player not in self.sessions:
+                game.step(player, 'skip')
+                continue
+            break
+
+        if game.game_over: return self._finish(game.game_over_reason())
+        self.broadcast(player, 'turn')
+        self._deadline = asyncio.get_running_loop().call_later(self.turn_timeout, self._timeout, player)
+
+
+    def _timeout(self, player: str):
+        """ Skip the turn of player if it is still its turn. """
+        if self._current_player() != player: return
+        self.broadcast(player + ' did not play in time', 'msg')
+        self.game.step(player, 'skip')
+        self._next_turn()
+
+
+    def _finish(self, reason: str):
+        """ Tell that the game is over and free its players. """
+        if self._deadline is not None: self._deadline.cancel()
+        self.game.game_over = True
+        self.broadcast(reason, 'over')
+        for session in self.sessions.values(): session.table = None
+        self.sessions = {}
+
+
+    def play(self, session: Session, action: Action):
+        """ Play the action of a player if it is its turn. """
+        if self._current_player() != session.name: return session.send('error', 'It is not your turn')
+
+        result = self.game.step(session.name, action)
+        if not result.accepted: return session.send('error', result.reason)
+        self._next_turn()
+
+
+    def leave(self, session: Session):
+        """ Remove a player from the game, its next turns being skipped. """
+        self.sessions.pop(session.name, None)
+        session.table = None
+        self.broadcast(session.name + ' left the game')
+        # Nothing is played before the game started
+        if self._index >= 0 and (self._current_player() == session.name or not self.sessions): self._next_turn()
+
+
+class GameServer:
+    """ Server matching the connected players and hosting their games.
+
+    The players asking for the same number of players, size and options wait
+    together until they are enough to start a game. Everything runs in the
+    event loop, only the generation of the labyrinths runs in an executor.
+
+    Attributes
+    ----------
+    host: str
+    port: int
+    turn_timeout: float
+    sessions: dict
+    waiting: dict
+
+    Methods
+    -------
+    __init__
+    start
+    serve_forever
+    close
+    """
+    def __init__(self, host='127.0.0.1', port=8765, turn_timeout=60., max_line_length=1024):
+        """ Initialize a server listening on host and port once started. """
+        self.host = host
+        self.port = port
+        self.turn_timeout = turn_timeout
+        self.max_line_length = max_line_length
+        self.sessions = {}
+        self.waiting = {}
+        self._server = None
+        self._tasks = set()
+
+
+    async def start(self):
+        """ Start listening, port 0 choosing a free port. """
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=self.max_line_length)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+
+    async def serve_forever(self):
+        if self._server is None: await self.start()
+        async with self._server: await self._server.serve_forever()
+
+
+    def close(self):
+        """ Stop listening and close the connections. """
+        if self._server is not None: self._server.close()
+        for session in list(self.sessions.values()): session.close()
+
+
+    async def _handle(self, reader, writer):
+        """ Read the commands of a connection until it is closed. """
+        session = Session(writer)
+        try:
+            while not writer.is_closing():
+                try: line = await reader.readline()
+                except (ValueError, ConnectionError): break
+                if not line: break
+                try: line = line.decode().strip()
+                except UnicodeDecodeError:
+                    session.send('error', 'Lines must be utf-8 encoded')
+                    continue
+                if line: self._execute(session, line)
+        finally:
+            self._disconnect(session)
+            session.close()
+
+
+    def _execute(self, session: Session, line: str):
+        """ Execute a command of a player. """
+        command, _, argument = line.partition(' ')
+        command = command.lower()
+
+        if command == 'quit': return session.close()
+        if command == 'help':
+            return session.send('ok', 'name <name>, play [players] [size] [options], leave, quit, '
+                                      + 'and during a game: ' + ', '.join(COMMANDS))
+        if command == 'name': return self._set_name(session, argument.strip())
+        if command == 'play': return self._wait(session, argument.split())
+        if command == 'leave' or (command == 'exit' and (session.table is not None or session.starting)):
+            if not self._leave(session): return session.send('error', 'You are not playing or waiting')
+            return session.send('ok', 'You left')
+
+        action = parse_command(line)
+        if session.table is not None and action is not None: return session.table.play(session, action)
+        if session.starting and action is not None: return session.send('error', 'The game is starting')
+        session.send('error', 'Command unknown, send help to list the commands')
+
+
+    def _set_name(self, session: Session, name: str):
+        if session.table is not None or session.waiting is not None or session.starting:
+            return session.send('error', 'You cannot change your name now')
+        if not name or len(name) > 32 or ' ' in name: return session.send('error', 'Invalid name')
+        if name in self.sessions or name == 'Bear NPC': return session.send('error', 'This name is taken')
+
+        if session.name is not None: del self.sessions[session.name]
+        session.name = name
+        self.sessions[name] = session
+        session.send('ok', 'You are ' + name)
+
+
+    def _wait(self, session: Session, arguments: list):
+        """ Add a player to the players waiting for a game, starting it if there are enough. """
+        if session.name is None: return session.send('error', 'Choose a name first')
+        if session.table is not None or session.waiting is not None or session.starting:
+            return session.send('error', 'You are already playing or waiting')
+        try:
+            nb_players = int(arguments[0]) if len(arguments) > 0 else 2
+            size = int(arguments[1]) if len(arguments) > 1 else 8
+        except ValueError: return session.send('error', 'The number of players and the size must be integers')
+        options = {opt: False for opt in OPTIONS}
+        for opt in arguments[2].split(',') if len(arguments) > 2 else []:
+            if opt not in options: return session.send('error', 'Unknown option ' + opt)
+            options[opt] = True
+        if not 1 <= nb_players <= 8 or not 4 <= size <= 12 or (size == 4 and nb_players > 4):
+            return session.send('error', 'The size must be between 4 and 12 and there can be at most 8 players')
+
+        key = nb_players, size, tuple(sorted(options.items()))
+        waiting = self.waiting.setdefault(key, [])
+        waiting.append(session)
+        session.waiting = key
+        for player in waiting: player.send('wait', '{}/{}'.format(len(waiting), nb_players))
+
+        if len(waiting) == nb_players:
+            del self.waiting[key]
+            for player in waiting:
+                player.waiting = None
+                player.starting = True
+            task = asyncio.ensure_future(self._start_table(waiting, size, options))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+
+    async def _start_table(self, sessions: list, size: int, options: dict):
+        """ Generate a labyrinth without blocking the other sessions and start the game.
+
+        The players are starting the game until the table exists, those which
+        left or disconnected meanwhile leaving it before it starts.
+        """
+        try:
+            labyrinth = await asyncio.get_running_loop().run_in_executor(None, Labyrinth, size, len(sessions),
+                                                                         options)
+        except Exception:
+            for session in sessions:
+                session.starting = session.leaving = False
+                session.send('error', 'The game could not be started')
+            raise
+
+        table = Table(sessions, labyrinth, options, self.turn_timeout)
+        for session in sessions:
+            leaving = session.leaving or session.writer.is_closing()
+            session.starting = session.leaving = False
+            if leaving: table.leave(session)
+        if table.sessions: table.start()
+
+
+    def _leave(self, session: Session):
+        """ Remove a player from the waiting players or from its game, return False if it was in neither.
+
+        A player whose game is starting leaves it once it is started.
+        """
+        if session.waiting is not None:
+            waiting = self.waiting[session.waiting]
+            waiting.remove(session)
+            if not waiting: del self.waiting[session.waiting]
+            session.waiting = None
+            return True
+        if session.starting:
+            session.leaving = True
+            return True
+        if session.table is not None:
+            session.table.leave(session)
+            return True
+        return False
+
+
+    def _disconnect(self, session: Session):
+        self._leave(session)
+        if self.sessions.get(session.name) is session: del self.sessions[session.name]
+
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Host games of the labyrinth over TCP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--turn-timeout', type=float, default=60., help='seconds given to a player to play')
+    args = parser.parse_args()
+
+    server = GameServer(args.host, args.port, args.turn_timeout)
+    print('Serving on {}:{}'.format(args.host, args.port))
+    try: asyncio.run(server.serve_forever())
+    except KeyboardInterrupt: pass
@@ -0,0 +1,154 @@
+""" File containing the functions to play games without a terminal.
+
+Run this file to simulate games in parallel and print the statistics.
+"""
+
+
+from collections import Counter
+from multiprocessing import Pool
+
+from commands import parse_command
+from game import Game
+from labyrinth import Labyrinth
+from player import Player, Status
+from rng import fork_rng
+
+
+ACTIONS = [parse_command(command) for command in ['w', 's', 'a', 'd',
+                                                   'shoot up', 'shoot down', 'shoot left', 'shoot right',
+                                                   'e',
+                                                   'skip']]
+
+
+def random_policy(game: Game, player: str):
+    """ Return a random action among the possible actions of the player, drawn with the game generator. """
+    return game.rng.choice([action for action in ACTIONS if game.is_move_possible(player, action)[0]])
+
+
+def play_game(game: Game, policy=random_policy, max_turns=1000):
+    """ Play a game until it is over or max_turns turns are played.
+
+    The policy is a callable taking the game and a player name and returning an
+    action of the player, an action not possible makes the player lose its turn.
+    Return the result of the last action played.
+    """
+    result = None
+    while not game.game_over and game.turn < max_turns:
+        for player in game.players:
+
+            if game.players[player].status == Status.DEAD: continue
+
+            result = game.step(player, policy(game, player))
+            if game.game_over: break
+
+        if not game.game_over: game.turn += 1
+
+    return result
+
+
+def new_game(size: int, nb_players: int, options=None, seed=None):
+    """ Make a game of nb_players players on a new labyrinth with players placed randomly.
+
+    The labyrinth and the game use independent generators forked from seed.
+    """
+    options = options or {}
+    players = {'Player {}'.format(i + 1): Player() for i in range(nb_players)}
+    labyrinth = Labyrinth(size, nb_players, options, rng=fork_rng(seed, 'labyrinth'))
+    game = Game(labyrinth, players, rng=fork_rng(seed, 'game'))
+    if options.get('bear'): game.players['Bear NPC'] = Player()
+    game.randomly_place_players()
+
+    return game
+
+
+def _play_chunk(task):
+    """ Play the games of a chunk of seeds and return their statistics. """
+    size, nb_players, options, seeds, policy, max_turns = task
+    stats = Counter()
+    for seed in seeds:
+        game = new_game(size, nb_players, options, seed)
+        starts = {player: game.players[player].position for player in game.players}
+        play_game(game, policy, max_turns)
+
+        stats['games'] += 1
+        stats['turns'] += game.turn
+        for player, position in starts.items(): stats['start', position] += 1
+        if not game.game_over: continue
+
+        stats['finished'] += 1
+        exit_position = game.labyrinth.exit_cell.position
+        winners = [p for p in game.players if game.players[p].position == exit_position
+                                              and game.players[p].carry]
+        if winners: stats['escapes'] += 1
+        else:
+            winners = [p for p in game.players if game.players[p].status != Status.DEAD]
+            stats['murders'] += 1
+        stats['winner', winners[0]] += 1
+        stats['win', starts[winners[0]]] += 1
+
+    return stats
+
+
+def simulate(size: int, nb_players: int, options=None, seeds=range(100), policy=random_policy,
+             max_turns=1000, processes=None, chunksize=16):
+    """ Play one game per seed in a pool of processes and return the merged statistics.
+
+    The seeds are sent by chunks of chunksize to the processes, each one playing
+    its games on its own and sending back only its counters. The policy must be
+    a module-level function so that it can be sent to the processes, processes=1
+    plays all the games in the current process.
+    """
+    seeds = list(seeds)
+    tasks = [(size, nb_players, options, seeds[i:i + chunksize], policy, max_turns)
+             for i in range(0, len(seeds), chunksize)]
+
+    stats = Counter()
+    if processes == 1:
+        for task in tasks: stats.update(_play_chunk(task))
+    else:
+        with Pool(processes) as pool:
+            for chunk_stats in pool.imap_unordered(_play_chunk, tasks): stats.update(chunk_stats)
+
+    return stats
+
+
+def make_report(stats: Counter):
+    """ Return a dictionary summarizing statistics returned by simulate. """
+    games = stats['games']
+    starts = {key[1]: nb for key, nb in stats.items() if isinstance(key, tuple) and key[0] == 'start'}
+    wins = {key[1]: nb for key, nb in stats.items() if isinstance(key, tuple) and key[0] == 'win'}
+
+    return {'games': games,
+            'finished': stats['finished'],
+            'escapes': stats['escapes'],
+            'murders': stats['murders'],
+            'average_turns': stats['turns'] / games if games else 0,
+            'wins_by_player': {key[1]: nb for key, nb in stats.items()
+                                          if isinstance(key, tuple) and key[0] == 'winner'},
+            'win_rate_by_start': {pos: wins.get(pos, 0) / nb for pos, nb in sorted(starts.items())}}
+
+
+if __name__ == '__main__':
+
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Simulate games of the labyrinth with random players.')
+    parser.add_argument('--size', type=int, default=8)
+    parser.add_argument('--players', type=int, default=2)
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--options', default='', help='options separated by a comma')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--max-turns', type=int, default=1000)
+    args = parser.parse_args()
+
+    options = {opt.strip(): True for opt in args.options.split(',') if opt.strip()}
+    start = time.perf_counter()
+    stats = simulate(args.size, args.players, options, range(args.games),
+                     max_turns=args.max_turns, processes=args.processes)
+    duration = time.perf_counter() - start
+
+    report = make_report(stats)
+    for key in ['games', 'finished', 'escapes', 'murders', 'average_turns', 'wins_by_player']:
+        print('{}: {}'.format(key, report[key]))
+    print('{:.1f} games per second'.format(report['games'] / duration))
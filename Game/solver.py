@@ -0,0 +1,278 @@
+""" File containing the shortest path solver of the labyrinths.
+
+The solver computes distance fields, the number of turns needed to go from or
+to some positions, with a breadth first search over the moves a player can
+make: moving through an open junction, staying in place and going through a
+wormhole, the river flow moving the player after each of them. The search is
+vectorized with numpy if it is installed.
+"""
+
+
+from array import array
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from cell import Content
+from labyrinth import Labyrinth
+
+
+class Solver:
+    """ Distance fields of a labyrinth.
+
+    A field is an array where the distance of position (x, y) is at index
+    x * size + y, -1 meaning that it cannot be reached. The fields are cached
+    until the contents of the labyrinth change, which is known with its
+    revision, the walls, the river and the wormholes never changing.
+
+    Attributes
+    ----------
+    labyrinth: labyrinth
+    vectorized: bool
+    max_fields: int
+
+    Methods
+    -------
+    __init__
+    distances_from
+    distances_to
+    exit_field
+    treasure_field
+    player_field
+    distance
+    """
+    def __init__(self, labyrinth: Labyrinth, vectorized=None, max_fields=32):
+        """ Initialize the solver of a labyrinth, vectorized if numpy is installed unless specified.
+
+        At most max_fields fields are cached, the oldest one being forgotten first.
+        """
+        if vectorized is None: vectorized = np is not None
+        self.labyrinth = labyrinth
+        self.vectorized = vectorized
+        self.max_fields = max_fields
+        self._fields = {}
+        self._revision = labyrinth.revision
+
+        if vectorized:
+            sources, destinations = self._get_moves_arrays()
+            self._successors = self._make_table(sources, destinations)
+            self._predecessors = self._make_table(destinations, sources)
+        else:
+            sources, destinations = self._get_moves()
+            self._successors = [[] for i in range(labyrinth.size**2)]
+            self._predecessors = [[] for i in range(labyrinth.size**2)]
+            for src, dst in set(zip(sources, destinations)):
+                self._successors[src].append(dst)
+                self._predecessors[dst].append(src)
+
+
+    def _get_moves(self):
+        """ Return the lists of the indexes of the starts and of the ends of the moves. """
+        labyrinth = self.labyrinth
+        size = labyrinth.size
+        horizontal = labyrinth.junctions.horizontal
+        vertical = labyrinth.junctions.vertical
+
+        sources = list(range(size**2))
+        destinations = list(range(size**2))
+        for idx in range((size - 1) * size):
+            if horizontal[idx]: continue
+            sources += [idx, idx + size]
+            destinations += [idx + size, idx]
+        for idx in range(size * (size - 1)):
+            if vertical[idx]: continue
+            x, y = divmod(idx, size - 1)
+            sources += [x * size + y, x * size + y + 1]
+            destinations += [x * size + y + 1, x * size + y]
+        for (x1, y1), (x2, y2) in labyrinth.next_wormhole.items():
+            sources.append(x1 * size + y1)
+            destinations.append(x2 * size + y2)
+
+        drift = list(range(size**2))
+        for (x1, y1), (x2, y2) in labyrinth.river_drift.items(): drift[x1 * size + y1] = x2 * size + y2
+
+        return sources, [drift[idx] for idx in destinations]
+
+
+    def _get_moves_arrays(self):
+        """ Return the arrays of the indexes of the starts and of the ends of the moves. """
+        labyrinth = self.labyrinth
+        size = labyrinth.size
+        horizontal = np.frombuffer(bytes(labyrinth.junctions.horizontal), np.uint8)
+        vertical = np.frombuffer(bytes(labyrinth.junctions.vertical), np.uint8)
+
+        right = np.flatnonzero(horizontal == 0)
+        up = np.flatnonzero(vertical == 0)
+        up += up // (size - 1)
+        wormholes = np.array([(x1 * size + y1, x2 * size + y2)
+                              for (x1, y1), (x2, y2) in labyrinth.next_wormhole.items()], np.int64).reshape(-1, 2)
+        cells = np.arange(size**2)
+        sources = np.concatenate([cells, right, right + size, up, up + 1, wormholes[:, 0]])
+        destinations = np.concatenate([cells, right + size, right, up + 1, up, wormholes[:, 1]])
+
+        drift = np.arange(size**2)
+        for (x1, y1), (x2, y2) in labyrinth.river_drift.items(): drift[x1 * size + y1] = x2 * size + y2
+
+        return sources, drift[destinations]
+
+
+    def _make_table(self, keys, values):
+        """ Return the table of the values of each key, padded with size**2. """
+        nb = self.labyrinth.size**2
+        moves = np.unique(keys * nb + values)
+        keys, values = np.divmod(moves, nb)
+        counts = np.bincount(keys, minlength=nb)
+        ranks = np.arange(len(keys)) - np.repeat(np.cumsum(counts) - counts, counts)
+        table = np.full((nb, counts.max()), nb, np.int64)
+        table[keys, ranks] = values
+        return table
+
+
+    def _search(self, table, positions):
+        """ Return the field of the distances from positions following the moves of table. """
+        size = self.labyrinth.size
+        starts = [x * size + y for x, y in positions]
+
+        if self.vectorized:
+            # The padding index is set as reached so that it is never added to the frontier
+            distances = np.full(size**2 + 1, -1, np.int32)
+            distances[-1] = 0
+            frontier = np.unique(np.array(starts, np.int64))
+            distances[frontier] = 0
+            distance = 0
+            while frontier.size:
+                distance += 1
+                frontier = table[frontier].ravel()
+                frontier = np.unique(frontier[distances[frontier] < 0])
+                distances[frontier] = distance
+            return distances[:-1]
+
+        distances = array('i', [-1]) * size**2
+        queue = deque(starts)
+        for idx in starts: distances[idx] = 0
+        while queue:
+            idx = queue.popleft()
+            for next_idx in table[idx]:
+                if distances[next_idx] < 0:
+                    distances[next_idx] = distances[idx] + 1
+                    queue.append(next_idx)
+        return distances
+
+
+    def _get_field(self, key, table, positions):
+        """ Return the field cached with key, computing it if needed. """
+        if self.labyrinth.revision != self._revision:
+            self._fields.clear()
+            self._revision = self.labyrinth.revision
+        if key not in self._fields:
+            if len(self._fields) >= self.max_fields: del self._fields[next(iter(self._fields))]
+            self._fields[key] = self._search(table, positions)
+        return self._fields[key]
+
+
+    def distances_from(self, positions):
+        """ Return the field of the number of turns needed to go from the closest of positions to each position. """
+        positions = tuple(sorted(positions))
+        return self._get_field(('from', positions), self._successors, positions)
+
+
+    def distances_to(self, positions):
+        """ Return the field of the number of turns needed to go from each position to the closest of positions. """
+        positions = tuple(sorted(positions))
+        return self._get_field(('to', positions), self._predecessors, positions)
+
+
+    def exit_field(self):
+        """ Return the field of the number of turns needed to reach the exit. """
+        return self.distances_to([self.labyrinth.exit_cell.position])
+
+
+    def treasure_field(self):
+        """ Return the field of the number of turns needed to reach the treasure, unreachable if it is carried. """
+        return self.distances_to(find_positions(self.labyrinth, Content.TREASURE))
+
+
+    def player_field(self, position: tuple):
+        """ Return the field of the number of turns needed by a player at position to reach each position. """
+        return self.distances_from([position])
+
+
+    def distance(self, field, position: tuple):
+        """ Return the distance of position in field, None if it cannot be reached. """
+        x, y = position
+        distance = int(field[x * self.labyrinth.size + y])
+        if distance < 0: return None
+        return distance
+
+
+def find_positions(labyrinth: Labyrinth, content: Content):
+    """ Return the list of the positions of the cells with the specified content. """
+    size = labyrinth.size
+    contents = getattr(labyrinth, 'contents', None)
+    if contents is None:
+        return [pos for pos, cell in labyrinth.cells.items() if cell.content == content]
+    if np is not None and isinstance(contents, np.ndarray):
+        return [divmod(int(idx), size) for idx in np.flatnonzero(contents.reshape(-1) == content)]
+    return [divmod(idx, size) for idx, code in enumerate(bytes(contents)) if code == content]
+
+
+def is_solvable(labyrinth: Labyrinth, starts=None, solver=None):
+    """ Return True if the treasure can be taken to the exit from every start.
+
+    The starts are the positions where the players can be placed, the empty
+    cells, if they are not specified.
+    """
+    solver = solver or Solver(labyrinth)
+    if starts is None: starts = find_positions(labyrinth, Content.EMPTY)
+    treasures = find_positions(labyrinth, Content.TREASURE)
+    if len(treasures) != 1: return False
+
+    if solver.distance(solver.exit_field(), treasures[0]) is None: return False
+    to_treasure = solver.treasure_field()
+    return all(solver.distance(to_treasure, pos) is not None for pos in starts)
+
+
+def difficulty(labyrinth: Labyrinth, starts=None, solver=None):
+    """ Return a dictionary of metrics describing how hard a labyrinth is.
+
+    The distances are numbers of turns, from the starts, the empty cells if
+    they are not specified, to the treasure and from the treasure to the exit.
+    """
+    solver = solver or Solver(labyrinth)
+    if starts is None: starts = find_positions(labyrinth, Content.EMPTY)
+    treasure, = find_positions(labyrinth, Content.TREASURE)
+    to_treasure = solver.treasure_field()
+    to_exit = solver.exit_field()
+
+    distances = [solver.distance(to_treasure, pos) for pos in starts]
+    reachable = [distance for distance in distances if distance is not None]
+    walls = bytes(labyrinth.junctions.horizontal) + bytes(labyrinth.junctions.vertical)
+
+    return {'treasure_to_exit': solver.distance(to_exit, treasure),
+            'mean_to_treasure': sum(reachable) / len(reachable) if reachable else None,
+            'max_to_treasure': max(reachable, default=None),
+            'unreachable_starts': len(distances) - len(reachable),
+            'dead_ends': _count_dead_ends(labyrinth),
+            'wall_ratio': walls.count(1) / len(walls) if walls else 0}
+
+
+def _count_dead_ends(labyrinth: Labyrinth):
+    """ Return the number of cells with a single open junction. """
+    size = labyrinth.size
+    horizontal = labyrinth.junctions.horizontal
+    vertical = labyrinth.junctions.vertical
+    openings = [0] * size**2
+    for idx in range((size - 1) * size):
+        if not horizontal[idx]:
+            openings[idx] += 1
+            openings[idx + size] += 1
+    for idx in range(size * (size - 1)):
+        if not vertical[idx]:
+            x, y = divmod(idx, size - 1)
+            openings[x * size + y] += 1
+            openings[x * size + y + 1] += 1
+
+    return openings.count(1)
@@ -0,0 +1,285 @@
+""" File containing the environment playing many games at once with array operations.
+
+It requires numpy, which is optional for the rest of the game.
+"""
+
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from cell import Content
+from commands import COMMANDS, Kind
+from grid import GridLabyrinth
+from player import Status
+from rng import fork_rng
+from weapon import PISTOL, SHOTGUN, BEAR_PAW
+
+
+# Actions of the players, the action given for a game is an index in this list
+ACTIONS = [COMMANDS[command] for command in ['w', 's', 'a', 'd',
+                                             'shoot up', 'shoot down', 'shoot left', 'shoot right',
+                                             'e',
+                                             'skip']]
+# Weapons by code, as in the game records
+WEAPONS = [None, PISTOL, SHOTGUN, BEAR_PAW]
+
+
+class VectorEnv:
+    """ Environment playing nb_envs independent games of nb_players players with the rules of Game.
+
+    At each step every game plays the action of its current player, an action
+    not possible making the player lose its turn as in simulation.play_game,
+    then the turn goes to the next living player. The moves, shots, cell
+    activations, wormholes and river flow of all games are resolved together
+    with array operations. The bear NPC is not supported.
+
+    The observations are a preallocated uint8 array of shape (nb_envs,
+    2 + nb_players, size**2), position (x, y) being at x * size + y:
+    - plane 0 holds the contents of the cells,
+    - plane 1 holds the directions in which a player can move, see commands.py,
+    - plane 2 + p holds 1 + status + 4 * carry at the position of player p.
+    The contents of the games are stored in the plane 0 itself.
+
+    Attributes
+    ----------
+    size: int
+    nb_envs: int
+    nb_players: int
+    observations: numpy.ndarray
+    positions: numpy.ndarray
+    statuses: numpy.ndarray
+    carry: numpy.ndarray
+    weapons: numpy.ndarray
+    current: numpy.ndarray
+    turns: numpy.ndarray
+    winners: numpy.ndarray
+
+    Methods
+    -------
+    __init__
+    reset
+    step
+    legal_actions
+    """
+    def __init__(self, size: int, nb_envs: int, nb_players: int, options=None, seed=None, max_turns=None,
+                 labyrinth_class=GridLabyrinth):
+        """ Initialize the games on labyrinths made with labyrinth_class.
+
+        The labyrinths are generated from seed, a game is over after max_turns
+        turns if specified.
+        """
+        if np is None: raise ImportError('VectorEnv requires numpy')
+        if options and options.get('bear'): raise ValueError('The bear NPC is not supported by VectorEnv')
+        self.size = size
+        self.nb_envs = nb_envs
+        self.nb_players = nb_players
+        self.options = options
+        self.seed = seed
+        self.max_turns = max_turns
+        self.labyrinth_class = labyrinth_class
+        self.rng = np.random.default_rng(fork_rng(seed, 'vector env').getrandbits(64))
+
+        nb_cells = size**2
+        self.observations = np.zeros((nb_envs, 2 + nb_players, nb_cells), np.uint8)
+        self.contents = self.observations[:, 0]
+        self.move_masks = self.observations[:, 1]
+        self.fire_ranges = np.zeros((nb_envs, 4, nb_cells), np.int32)
+        self.drift = np.zeros((nb_envs, nb_cells), np.int32)
+        self.wormholes = np.zeros((nb_envs, nb_cells), np.int32)
+        self.exits = np.zeros(nb_envs, np.int32)
+
+        self.positions = np.zeros((nb_envs, nb_players), np.int32)
+        self.statuses = np.zeros((nb_envs, nb_players), np.uint8)
+        self.carry = np.zeros((nb_envs, nb_players), bool)
+        self.weapons = np.zeros((nb_envs, nb_players), np.uint8)
+        self.current = np.zeros(nb_envs, np.int32)
+        self.turns = np.zeros(nb_envs, np.int32)
+        self.winners = np.full(nb_envs, -1, np.int32)
+        self.episodes = np.zeros(nb_envs, np.int64)
+
+        self.rewards = np.zeros(nb_envs, np.float32)
+        self.dones = np.zeros(nb_envs, bool)
+        self._legal_actions = np.zeros((nb_envs, len(ACTIONS)), bool)
+        self._envs = np.arange(nb_envs)
+
+        self._kinds = np.array([action.kind for action in ACTIONS])
+        self._bits = np.array([action.bit for action in ACTIONS], np.uint8)
+        self._dx = np.array([action.dx for action in ACTIONS])
+        self._dy = np.array([action.dy for action in ACTIONS])
+        self._steps = self._dx * size + self._dy
+        self._directions = np.array([[(0, 1), (0, -1), (-1, 0), (1, 0)].index((action.dx, action.dy))
+                                     if action.kind in [Kind.MOVE, Kind.SHOOT] else 0 for action in ACTIONS])
+        self._distances = np.array([weapon.distance if weapon else 0 for weapon in WEAPONS])
+        self._damages = np.array([weapon.damage if weapon else 0 for weapon in WEAPONS])
+
+        self.reset()
+
+
+    def reset(self, envs=None):
+        """ Start new games in the environments envs, all of them if not specified, and return the observations. """
+        envs = self._envs if envs is None else np.asarray(envs)
+        for env in envs:
+            rng = fork_rng(self.seed, 'labyrinth', int(env), int(self.episodes[env]))
+            self._load(env, self.labyrinth_class(self.size, self.nb_players, self.options, rng=rng))
+            self.episodes[env] += 1
+
+        # The players are placed on distinct empty cells drawn by sorting random keys
+        keys = self.rng.random((len(envs), self.size**2))
+        keys[self.contents[envs] != Content.EMPTY] = 2
+        self.positions[envs] = np.argpartition(keys, self.nb_players - 1, axis=1)[:, :self.nb_players]
+        self.statuses[envs] = Status.HEALTHY
+        self.carry[envs] = False
+        self.weapons[envs] = 0
+        self.current[envs] = 0
+        self.turns[envs] = 0
+        self._update_players()
+
+        return self.observations
+
+
+    def _load(self, env: int, labyrinth):
+        """ Copy a labyrinth in the arrays of an environment. """
+        size = self.size
+        contents = getattr(labyrinth, 'contents', None)
+        if contents is None: contents = [labyrinth.cells[x, y].content for x in range(size) for y in range(size)]
+        self.contents[env] = np.asarray(contents, np.uint8).reshape(-1)
+        self.move_masks[env] = np.frombuffer(bytes(labyrinth.move_masks), np.uint8)
+        for i, direction in enumerate([(0, 1), (0, -1), (-1, 0), (1, 0)]):
+            self.fire_ranges[env, i] = np.array(labyrinth.fire_ranges[direction])
+
+        self.drift[env] = np.arange(size**2)
+        for (x1, y1), (x2, y2) in labyrinth.river_drift.items(): self.drift[env, x1 * size + y1] = x2 * size + y2
+        self.wormholes[env] = np.arange(size**2)
+        for (x1, y1), (x2, y2) in labyrinth.next_wormhole.items(): self.wormholes[env, x1 * size + y1] = x2 * size + y2
+        x, y = labyrinth.exit_cell.position
+        self.exits[env] = x * size + y
+
+
+    def _update_players(self):
+        """ Draw the players in their planes of the observations. """
+        players = self.observations[:, 2:]
+        players.fill(0)
+        envs = self._envs[:, None]
+        players[envs, np.arange(self.nb_players), self.positions] = 1 + self.statuses + 4 * self.carry
+
+
+    def legal_actions(self):
+        """ Return the array of shape (nb_envs, len(ACTIONS)) telling which actions the current players can play. """
+        envs = self._envs
+        current = self.current
+        positions = self.positions[envs, current]
+        masks = self.move_masks[envs, positions]
+        armed = (self.weapons[envs, current] == 1) | (self.weapons[envs, current] == 2)
+
+        legal = self._legal_actions
+        legal[:] = self._kinds == Kind.SKIP
+        legal |= (self._kinds == Kind.MOVE) & (masks[:, None] & self._bits != 0)
+        legal |= (self._kinds == Kind.SHOOT) & armed[:, None]
+        legal |= (self._kinds == Kind.ACTIVATE) & (self.contents[envs, positions] != Content.EMPTY)[:, None]
+        return legal
+
+
+    def step(self, actions, auto_reset=True):
+        """ Play the action of the current player of each game, given as indexes in ACTIONS.
+
+        Return the observations, the rewards, 1 for a player winning with its
+        action and 0 otherwise, and whether each game is over. The arrays are
+        the same at each step. The games over are started again if auto_reset
+        is True, their observations being the ones of the new games.
+        """
+        actions = np.asarray(actions)
+        envs = self._envs
+        current = self.current
+        kinds = self._kinds[actions]
+        positions = self.positions[envs, current]
+        contents = self.contents[envs, positions]
+        weapons = self.weapons[envs, current]
+
+        moves = (kinds == Kind.MOVE) & (self.move_masks[envs, positions] & self._bits[actions] != 0)
+        shots = (kinds == Kind.SHOOT) & ((weapons == 1) | (weapons == 2))
+        activations = (kinds == Kind.ACTIVATE) & (contents != Content.EMPTY)
+        accepted = moves | shots | activations | (kinds == Kind.SKIP)
+
+        positions = np.where(moves, positions + self._steps[actions], positions)
+        if shots.any(): self._shoot(shots, actions, positions, weapons)
+        if activations.any(): positions = self._activate(activations, positions, contents)
+
+        # The river flow moves the players having played to the river
+        on_river = accepted & (self.contents[envs, positions] == Content.RIVER)
+        positions = np.where(on_river, self.drift[envs, positions], positions)
+        self.positions[envs, current] = positions
+
+        alive = self.statuses != Status.DEAD
+        escaped = self.carry[envs, current] & (positions == self.exits)
+        murdered = (alive.sum(axis=1) == 1) & (self.nb_players > 1)
+        over = accepted & (escaped | murdered)
+        self.winners[:] = np.where(over, np.where(escaped, current, alive.argmax(axis=1)), -1)
+        self.rewards[:] = over & (self.winners == current)
+
+        # The turn goes to the next living player, the turn number increasing when going back to the first one
+        order = (current[:, None] + 1 + np.arange(self.nb_players)) % self.nb_players
+        following = order[envs, alive[envs[:, None], order].argmax(axis=1)]
+        self.turns += following <= current
+        self.current[:] = following
+
+        self.dones[:] = over
+        if self.max_turns is not None: self.dones |= self.turns >= self.max_turns
+        if auto_reset and self.dones.any(): self.reset(np.flatnonzero(self.dones))
+        else: self._update_players()
+
+        return self.observations, self.rewards, self.dones
+
+
+    def _shoot(self, shots, actions, positions, weapons):
+        """ Resolve the shots of the current players as Game.shoot does. """
+        envs = self._envs
+        size = self.size
+        players = np.arange(self.nb_players)
+        dx = self._dx[actions][:, None]
+        dy = self._dy[actions][:, None]
+        x, y = np.divmod(self.positions, size)
+        x_relative = x - (positions // size)[:, None]
+        y_relative = y - (positions % size)[:, None]
+        along = x_relative * dx + y_relative * dy
+        across = x_relative * dy - y_relative * dx
+        others = players != self.current[:, None]
+        reach = np.minimum(self.fire_ranges[envs, self._directions[actions], positions], self._distances[weapons])
+
+        # A player in the same cell is hit first, otherwise the closest living player in range
+        same_cell = others & (x_relative == 0) & (y_relative == 0)
+        in_line = (others & (self.statuses != Status.DEAD) & (across == 0)
+                   & (along >= 1) & (along <= reach[:, None]))
+        nb_players = self.nb_players
+        keys = np.where(same_cell, players, np.where(in_line, nb_players * (1 + along) + players, np.iinfo(np.int64).max))
+        targets = keys.argmin(axis=1)
+        hits = shots & (keys[envs, targets] != np.iinfo(np.int64).max)
+        self._hit(envs[hits], targets[hits], self._damages[weapons[hits]])
+
+
+    def _hit(self, envs, players, damages):
+        """ Change the statuses of players hit as Game.player_hit does, the carriers dropping the treasure. """
+        statuses = self.statuses[envs, players]
+        self.statuses[envs, players] = np.where((damages == 3) | (statuses != Status.HEALTHY),
+                                                Status.DEAD, Status.WOUNDED)
+        carriers = self.carry[envs, players]
+        self.contents[envs[carriers], self.positions[envs[carriers], players[carriers]]] = Content.TREASURE
+        self.carry[envs, players] = False
+
+
+    def _activate(self, activations, positions, contents):
+        """ Resolve the activations of the cells of the current players and return their positions. """
+        envs = self._envs
+        current = self.current
+
+        arsenals = activations & (contents == Content.ARSENAL)
+        draws = np.where(self.rng.random(self.nb_envs) < .5, 1, 2)
+        self.weapons[envs[arsenals], current[arsenals]] = draws[arsenals]
+
+        treasures = activations & (contents == Content.TREASURE)
+        self.carry[envs[treasures], current[treasures]] = True
+        self.contents[envs[treasures], positions[treasures]] = Content.EMPTY
+
+        wormholes = activations & (contents == Content.WORMHOLE)
+        return np.where(wormholes, self.wormholes[envs, positions], positions)
@@ -2,7 +2,9 @@
 
 
 class Weapon:
-	""" Weapon object to be used by a player object. 
+	""" Immutable weapon object to be used by a player object. 
+
+	The same instance can be shared by all the players carrying the weapon.
 
 	Methods
 	-------
@@ -14,8 +16,26 @@ class Weapon:
 	damage: int
 	distance: int
 	"""
+	__slots__ = ('name', 'damage', 'distance')
+
 	def __init__(self, name: str, damage: int, distance: int):
 		""" Initialize weapon's attributes. """
-		self.name = name
-		self.damage = damage
-		self.distance = distance
\ No newline at end of file
+		object.__setattr__(self, 'name', name)
+		object.__setattr__(self, 'damage', damage)
+		object.__setattr__(self, 'distance', distance)
+
+
+	def __setattr__(self, name, value):
+		raise AttributeError('weapons are immutable')
+
+
+	def __reduce__(self):
+		# The shared weapons are unpickled as themselves so that they can be compared by identity.
+		for name in ['PISTOL', 'SHOTGUN', 'BEAR_PAW']:
+			if globals().get(name) is self: return name
+		return Weapon, (self.name, self.damage, self.distance)
+
+
+PISTOL = Weapon('pistol', 2, 5)
+SHOTGUN = Weapon('shotgun', 3, 2)
+BEAR_PAW = Weapon('Bear paw', 2, 0)
@@ -0,0 +1,24 @@
+""" Tests of the comparison of the benchmark results. """
+
+
+from benchmark import compare
+
+
+def _results(status, time=.1):
+    result = {'class': 'labyrinth', 'size': 32, 'options': 'river', 'status': status}
+    if status == 'ok': result.update({'min': time, 'mean': time, 'peak_bytes': 1000, 'retained_bytes': 100})
+    return {'generation': [result], 'turns': [{'size': 16, 'action': 'move', 'us_per_call': 1.}]}
+
+
+def test_compare_reports_timeouts():
+    assert compare(_results('timeout'), _results('ok')) == [
+        (('generation', 'labyrinth', 32, 'river', 'status'), 'ok', 'timeout')]
+    assert compare(_results('timeout'), _results('timeout')) == [
+        (('generation', 'labyrinth', 32, 'river', 'status'), 'timeout', 'timeout')]
+
+
+def test_compare_reports_slower_cases_only():
+    assert compare(_results('ok'), _results('timeout')) == []
+    assert compare(_results('ok', .1), _results('ok', .1)) == []
+    assert compare(_results('ok', .2), _results('ok', .1)) == [
+        (('generation', 'labyrinth', 32, 'river', 'time'), .1, .2)]
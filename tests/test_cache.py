@@ -0,0 +1,36 @@
+""" Tests of the cache of generated labyrinths. """
+
+
+from cache import LabyrinthCache, estimate_size
+from cell import Content
+from labyrinth import Labyrinth
+from renderer import render_labyrinth
+
+
+def test_clones_are_isolated():
+    cache = LabyrinthCache()
+    first = cache.get(8, 2, {'wormhole': True}, seed=1)
+    second = cache.get(8, 2, {'wormhole': True}, seed=1)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert render_labyrinth(first) == render_labyrinth(second)
+
+    treasure = first.treasure_cell.position
+    first.set_content(treasure, Content.EMPTY)
+    assert first.cells[treasure].content == Content.EMPTY
+    assert second.cells[treasure].content == Content.TREASURE
+    assert cache.get(8, 2, {'wormhole': True}, seed=1).cells[treasure].content == Content.TREASURE
+
+
+def test_clones_share_the_tables():
+    cache = LabyrinthCache()
+    first = cache.get(8, 2, {'river': True, 'wormhole': True}, seed=2)
+    second = cache.get(8, 2, {'river': True, 'wormhole': True}, seed=2)
+    for name in ['move_masks', 'open_moves', 'fire_ranges', 'river_drift', 'next_wormhole']:
+        assert name in vars(first)
+        assert vars(first)[name] is vars(second)[name]
+
+
+def test_estimate_size_builds_nothing():
+    labyrinth = Labyrinth(8, 2, seed=3)
+    estimate_size(labyrinth)
+    assert not {'neighbors', 'interior_neighbors', 'open_moves', 'move_masks'} & set(vars(labyrinth))
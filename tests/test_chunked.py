@@ -0,0 +1,55 @@
+""" Tests of the labyrinths generated tile by tile. """
+
+
+from collections import deque
+
+from cell import Content
+from chunked import ChunkedLabyrinth, DIRECTIONS
+
+
+def test_tiles_are_connected_across_their_borders():
+    size = 64
+    labyrinth = ChunkedLabyrinth(size, 2, seed=3, tile_size=16, max_tiles=4)
+    reached = {(0, 0)}
+    queue = deque(reached)
+    while queue:
+        x, y = queue.popleft()
+        mask = labyrinth.get_mask((x, y))
+        for direction, dx, dy, bit in DIRECTIONS:
+            if not mask & bit: continue
+            position = x + dx, y + dy
+            assert 0 <= position[0] < size and 0 <= position[1] < size
+            if position not in reached:
+                reached.add(position)
+                queue.append(position)
+    assert len(reached) == size**2
+
+    # The walls on the borders of the tiles are seen from both sides.
+    for direction, dx, dy, bit in DIRECTIONS:
+        opposite = next(b for d, dx2, dy2, b in DIRECTIONS if (dx2, dy2) == (-dx, -dy))
+        for x in range(size):
+            for y in range(size):
+                if 0 <= x + dx < size and 0 <= y + dy < size:
+                    assert bool(labyrinth.get_mask((x, y)) & bit) == bool(labyrinth.get_mask((x + dx, y + dy))
+                                                                          & opposite)
+
+
+def test_evicted_tiles_are_generated_again_identically():
+    labyrinth = ChunkedLabyrinth(64, 2, seed=3, tile_size=16, max_tiles=2)
+    resident = ChunkedLabyrinth(64, 2, seed=3, tile_size=16, max_tiles=16)
+    tile = labyrinth._get_tile(0, 0)
+    contents, masks = bytes(tile.contents), bytes(tile.masks)
+    labyrinth.set_content((5, 5), Content.HOSPITAL)
+
+    for tx in range(4):
+        for ty in range(4): labyrinth._get_tile(tx, ty)
+    assert (0, 0) not in labyrinth.tiles
+
+    tile = labyrinth._get_tile(0, 0)
+    assert bytes(tile.masks) == masks
+    assert labyrinth.get_content((5, 5)) == Content.HOSPITAL
+    assert all(a == b for i, (a, b) in enumerate(zip(tile.contents, contents)) if i != 5 * 16 + 5)
+
+    positions = [(x, y) for x in range(0, 64, 3) for y in range(0, 64, 5) if (x, y) != (5, 5)]
+    assert all(labyrinth.get_content(pos) == resident.get_content(pos) for pos in positions)
+    assert all(labyrinth.get_mask(pos) == resident.get_mask(pos) for pos in positions)
@@ -0,0 +1,119 @@
+""" Tests of the game engine on small hand-built labyrinths. """
+
+
+from cell import Content
+from commands import ACTIVATE, MOVES, SHOTS
+from game import Game
+from labyrinth import Labyrinth
+from player import Player, Status
+from weapon import PISTOL, SHOTGUN
+
+
+def _make_labyrinth(size=4, exit=(3, 0), treasure=(2, 0)):
+    """ Return a labyrinth without any wall whose cells are empty but the exit and the treasure. """
+    labyrinth = Labyrinth(size, 2, seed=0)
+    for pos in labyrinth.cells: labyrinth.set_content(pos, Content.EMPTY)
+    labyrinth.set_content(exit, Content.EXIT)
+    labyrinth.set_content(treasure, Content.TREASURE)
+    labyrinth.exit_cell = labyrinth.cells[exit]
+    labyrinth.treasure_cell = labyrinth.cells[treasure]
+    labyrinth.junctions.horizontal[:] = bytes(len(labyrinth.junctions.horizontal))
+    labyrinth.junctions.vertical[:] = bytes(len(labyrinth.junctions.vertical))
+    labyrinth.river_drift = {}
+    labyrinth.next_wormhole = {}
+    return labyrinth
+
+
+def test_occupancy_follows_the_moves():
+    game = Game(_make_labyrinth(), {'A': Player((0, 0)), 'B': Player((1, 0)), 'C': Player((1, 0))})
+    assert game.occupancy == {(0, 0): {'A': None}, (1, 0): {'B': None, 'C': None}}
+    assert game.players_at((1, 0)) == ['B', 'C']
+
+    game.step('C', MOVES['left'])
+    assert game.players_at((0, 0)) == ['A', 'C']
+    game.step('A', MOVES['right'])
+    assert game.players_at((1, 0)) == ['A', 'B']
+    assert game.players_at((0, 0)) == ['C']
+    game.step('A', MOVES['up'])
+    game.step('B', MOVES['up'])
+    game.step('C', MOVES['up'])
+    assert game.occupancy == {(1, 1): {'A': None, 'B': None}, (0, 1): {'C': None}}
+    assert game.players_at((1, 0)) == []
+
+
+def test_counters_follow_the_deaths():
+    game = Game(_make_labyrinth(), {'A': Player((0, 0), weapon=SHOTGUN), 'B': Player((0, 0)),
+                                    'C': Player((0, 2), status=Status.WOUNDED)})
+    assert list(game.alive) == ['A', 'B', 'C']
+
+    result = game.step('A', SHOTS['up'])
+    assert game.players['B'].status == Status.DEAD
+    assert list(game.alive) == ['A', 'C'] and not result.game_over
+
+    game.step('A', MOVES['up'])
+    result = game.step('A', SHOTS['up'])
+    assert game.players['C'].status == Status.DEAD
+    assert list(game.alive) == ['A'] and result.game_over
+    assert result.reason == 'A is the only player alive and wins, congrats you murderer!'
+
+
+def test_counters_follow_the_treasure_and_the_escape():
+    game = Game(_make_labyrinth(), {'A': Player((1, 0)), 'B': Player((0, 0), weapon=SHOTGUN)})
+    game.step('A', MOVES['right'])
+    game.step('A', ACTIVATE)
+    assert list(game.carriers) == ['A'] and game.escaped is None
+
+    # A player hit drops the treasure.
+    game.step('B', SHOTS['right'])
+    assert game.carriers == {} and game.players['A'].status == Status.DEAD
+    assert game.labyrinth.cells[2, 0].content == Content.TREASURE
+
+    game = Game(_make_labyrinth(), {'A': Player((2, 0)), 'B': Player((0, 3))})
+    game.step('A', ACTIVATE)
+    result = game.step('A', MOVES['right'])
+    assert game.escaped == 'A' and result.game_over
+    assert result.reason == 'A escapes with the treasure and wins!'
+
+
+def _shoot(shooter: Player, target: Player, wall=None, size=8):
+    """ Return the messages of the shot up of shooter at target, with a wall above the position wall if specified. """
+    labyrinth = _make_labyrinth(size, exit=(size - 1, 0), treasure=(size - 2, 0))
+    if wall is not None: labyrinth.junctions[wall, (wall[0], wall[1] + 1)] = 'wall'
+    game = Game(labyrinth, {'A': shooter, 'B': target})
+    result = game.step('A', SHOTS['up'])
+    assert result.accepted
+    return [event.message for event in result.events if event.kind != 'game over']
+
+
+def test_shots_stop_at_the_walls():
+    target = Player((0, 3))
+    assert _shoot(Player((0, 0), weapon=PISTOL), target, wall=(0, 1)) == ['The bullet hit a wall']
+    assert target.status == Status.HEALTHY
+    assert _shoot(Player((0, 0), weapon=PISTOL), target, wall=(0, 3)) == ['B got hit, and is now wounded']
+    assert target.status == Status.WOUNDED
+
+    # The edge of the labyrinth stops the bullets as well.
+    assert _shoot(Player((0, 6), weapon=PISTOL), Player((1, 0))) == ['The bullet hit a wall']
+
+
+def test_shots_stop_at_the_distance_of_the_weapons():
+    assert _shoot(Player((0, 0), weapon=PISTOL), Player((0, 6))) == ['Nothing happens']
+    target = Player((0, 5))
+    assert _shoot(Player((0, 0), weapon=PISTOL), target) == ['B got hit, and is now wounded']
+
+    assert _shoot(Player((0, 0), weapon=SHOTGUN), Player((0, 3))) == ['Nothing happens']
+    target = Player((0, 2))
+    assert _shoot(Player((0, 0), weapon=SHOTGUN), target) == ['B got hit, and is now dead']
+    assert target.status == Status.DEAD
+
+    # A bullet reaching the edge exactly at the distance of the weapon hits the wall.
+    assert _shoot(Player((0, 5), weapon=SHOTGUN), Player((1, 0))) == ['The bullet hit a wall']
+
+
+def test_shots_go_through_the_dead_players():
+    labyrinth = _make_labyrinth(8, exit=(7, 0), treasure=(6, 0))
+    game = Game(labyrinth, {'A': Player((0, 0), weapon=PISTOL), 'B': Player((0, 1), status=Status.DEAD),
+                            'C': Player((0, 4))})
+    game.step('A', SHOTS['up'])
+    assert game.players['B'].status == Status.DEAD
+    assert game.players['C'].status == Status.WOUNDED
@@ -0,0 +1,22 @@
+""" Tests of the generation of the labyrinths. """
+
+
+import pytest
+
+import grid
+from grid import GridLabyrinth
+from labyrinth import Labyrinth
+from solver import is_solvable
+
+
+@pytest.mark.parametrize('labyrinth_class', [Labyrinth, pytest.param(GridLabyrinth, marks=pytest.mark.skipif(
+    grid.np is None, reason='GridLabyrinth requires numpy'))])
+def test_river_labyrinths_are_solvable(labyrinth_class):
+    for seed in range(100):
+        labyrinth = labyrinth_class(10, 2, {'river': True}, seed=seed)
+        assert is_solvable(labyrinth), seed
+
+
+def test_labyrinths_are_solvable():
+    for seed in range(50):
+        assert is_solvable(Labyrinth(10, 2, {'wormhole': True}, seed=seed)), seed
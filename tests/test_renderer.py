@@ -0,0 +1,55 @@
+""" Tests of the drawing of the labyrinths. """
+
+
+import io
+
+from cell import Content
+from commands import ACTIVATE
+from game import Game
+from labyrinth import Labyrinth
+from player import Player
+from renderer import Renderer, render_labyrinth
+
+
+def test_diff_frames_only_redraw_changed_lines():
+    labyrinth = Labyrinth(6, 2, seed=1)
+    stream = io.StringIO()
+    renderer = Renderer(stream, diff=True)
+    renderer.draw(labyrinth)
+    assert stream.getvalue() == render_labyrinth(labyrinth) + '\n'
+
+    labyrinth.set_content(labyrinth.treasure_cell.position, Content.EMPTY)
+    stream.seek(0)
+    stream.truncate()
+    renderer.draw(labyrinth)
+    assert stream.getvalue().startswith('\x1b[')
+    assert stream.getvalue().count('\x1b[K') == 1
+
+
+def test_messages_make_the_next_frame_full():
+    labyrinth = Labyrinth(6, 2, seed=1)
+    stream = io.StringIO()
+    renderer = Renderer(stream, diff=True)
+    renderer.draw(labyrinth)
+    renderer.write('A message')
+
+    labyrinth.set_content(labyrinth.treasure_cell.position, Content.EMPTY)
+    stream.seek(0)
+    stream.truncate()
+    renderer.draw(labyrinth)
+    assert stream.getvalue() == render_labyrinth(labyrinth) + '\n'
+
+
+def test_map_frames_are_drawn_before_their_message():
+    labyrinth = Labyrinth(6, 2, seed=1)
+    position = next(pos for pos, cell in labyrinth.cells.items() if cell.content == Content.MAP)
+    stream = io.StringIO()
+    renderer = Renderer(stream, diff=True)
+    game = Game(labyrinth, {'A': Player(position)}, output=renderer.write, renderer=renderer)
+    renderer.draw(labyrinth.map_view())
+
+    # The map did not change, so only the message is written.
+    stream.seek(0)
+    stream.truncate()
+    game.step('A', ACTIVATE)
+    assert stream.getvalue() == 'You approach some strange writing on a rock and understand it is a map.\n'
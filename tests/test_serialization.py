@@ -0,0 +1,38 @@
+""" Tests of the binary format of the labyrinths. """
+
+
+from cell import Content
+from game import Game
+from labyrinth import Labyrinth
+from player import Player
+from renderer import render_labyrinth
+from serialization import dump_game, dump_labyrinth, load_game, load_labyrinth
+from weapon import PISTOL
+
+
+def test_clone_of_loaded_labyrinth_round_trip():
+    record = dump_labyrinth(Labyrinth(8, 2, {'river': True, 'wormhole': True}, seed=3))
+    labyrinth, offset = load_labyrinth(record)
+    assert offset == len(record)
+    assert dump_labyrinth(labyrinth) == record
+
+    clone = labyrinth.clone()
+    treasure = clone.treasure_cell.position
+    clone.set_content(treasure, Content.EMPTY)
+
+    loaded, offset = load_labyrinth(dump_labyrinth(clone))
+    assert loaded.cells[treasure].content == Content.EMPTY
+    assert ' T ' not in render_labyrinth(clone)
+    assert dump_labyrinth(loaded) == dump_labyrinth(clone)
+
+    # The original is not changed by its clone.
+    assert labyrinth.cells[treasure].content == Content.TREASURE
+    assert dump_labyrinth(labyrinth) == record
+
+
+def test_unplaced_players_round_trip():
+    game = Game(Labyrinth(6, 2, seed=1), {'A': Player((1, 2)), 'B': Player(weapon=PISTOL)})
+    loaded, offset = load_game(dump_game(game))
+    assert loaded.players['A'].position == (1, 2)
+    assert loaded.players['B'].position is None and loaded.players['B'].weapon is PISTOL
+    assert loaded.players_at((1, 2)) == ['A']
@@ -0,0 +1,78 @@
+""" Tests of the matchmaking of the server. """
+
+
+import asyncio
+
+from server import GameServer, Session
+
+
+class FakeTransport:
+
+    def get_write_buffer_size(self):
+        return 0
+
+
+class FakeWriter:
+    """ Writer recording the lines sent to a client. """
+    def __init__(self):
+        self.lines = []
+        self.transport = FakeTransport()
+        self.closing = False
+
+
+    def is_closing(self):
+        return self.closing
+
+
+    def write(self, data: bytes):
+        self.lines.append(data.decode().rstrip('\n'))
+
+
+    def close(self):
+        self.closing = True
+
+
+def _connect(server, name: str):
+    session = Session(FakeWriter())
+    server._execute(session, 'name ' + name)
+    return session
+
+
+def test_leave_while_the_game_is_starting():
+
+    async def play():
+        server = GameServer(turn_timeout=5.)
+        alice, bob = _connect(server, 'alice'), _connect(server, 'bob')
+        server._execute(alice, 'play 2 4')
+        server._execute(bob, 'play 2 4')
+
+        # The table is not made yet, alice cannot wait for another game but can leave this one.
+        server._execute(alice, 'play 2 4')
+        assert alice.writer.lines[-1].startswith('error')
+        assert not server.waiting
+        server._execute(alice, 'leave')
+        assert alice.writer.lines[-1] == 'ok You left'
+
+        await asyncio.gather(*server._tasks)
+        assert alice.table is None and not alice.starting
+        assert bob.table is not None and list(bob.table.sessions) == ['bob']
+        assert not any(line.startswith('start') for line in alice.writer.lines)
+        assert any(line.startswith('start') for line in bob.writer.lines)
+        bob.table._finish('Test over')
+
+    asyncio.run(play())
+
+
+def test_leave_without_game_is_refused():
+    server = GameServer()
+    alice = _connect(server, 'alice')
+    server._execute(alice, 'leave')
+    assert alice.writer.lines[-1].startswith('error')
+
+
+def test_help_lists_the_game_commands():
+    server = GameServer()
+    alice = _connect(server, 'alice')
+    server._execute(alice, 'help')
+    assert alice.writer.lines[-1].startswith('ok')
+    assert all(command in alice.writer.lines[-1] for command in ['move up', 'shoot left', 'activate cell', 'skip'])
@@ -0,0 +1,71 @@
+""" Tests of the shortest path solver on small hand-built labyrinths. """
+
+
+import pytest
+
+from cell import Content
+from labyrinth import Labyrinth
+from solver import Solver, np, is_solvable
+
+VECTORIZED = [False, pytest.param(True, marks=pytest.mark.skipif(np is None, reason='numpy is not installed'))]
+
+# Corridor snaking through a 3x3 labyrinth from (0, 0) to (2, 2)
+SNAKE = [(0, 0), (1, 0), (2, 0), (2, 1), (1, 1), (0, 1), (0, 2), (1, 2), (2, 2)]
+
+
+def _make_labyrinth(path, exit=(0, 0), treasure=(2, 2)):
+    """ Return a 3x3 labyrinth whose only open junctions link the consecutive positions of path. """
+    labyrinth = Labyrinth(3, 1, seed=0)
+    for pos in labyrinth.cells: labyrinth.set_content(pos, Content.EMPTY)
+    labyrinth.set_content(exit, Content.EXIT)
+    labyrinth.set_content(treasure, Content.TREASURE)
+    labyrinth.exit_cell = labyrinth.cells[exit]
+    labyrinth.treasure_cell = labyrinth.cells[treasure]
+
+    junctions = labyrinth.junctions
+    junctions.horizontal[:] = b'\x01' * len(junctions.horizontal)
+    junctions.vertical[:] = b'\x01' * len(junctions.vertical)
+    for p1, p2 in zip(path, path[1:]): junctions[p1, p2] = 'nothing'
+    labyrinth.river_drift = {}
+    labyrinth.next_wormhole = {}
+    return labyrinth
+
+
+@pytest.mark.parametrize('vectorized', VECTORIZED)
+def test_distances_along_a_corridor(vectorized):
+    labyrinth = _make_labyrinth(SNAKE)
+    solver = Solver(labyrinth, vectorized=vectorized)
+    assert [solver.distance(solver.exit_field(), pos) for pos in SNAKE] == list(range(9))
+    assert solver.distance(solver.player_field((2, 1)), (0, 2)) == 3
+    assert solver.distance(solver.treasure_field(), (0, 0)) == 8
+    assert is_solvable(labyrinth, solver=solver)
+
+    # Once the treasure is taken, it cannot be reached anymore.
+    labyrinth.set_content((2, 2), Content.EMPTY)
+    assert solver.distance(solver.treasure_field(), (0, 0)) is None
+
+
+@pytest.mark.parametrize('vectorized', VECTORIZED)
+def test_walls_cut_the_corridor(vectorized):
+    labyrinth = _make_labyrinth(SNAKE[:5])
+    solver = Solver(labyrinth, vectorized=vectorized)
+    assert solver.distance(solver.exit_field(), (1, 1)) == 4
+    assert solver.distance(solver.exit_field(), (2, 2)) is None
+    assert not is_solvable(labyrinth, solver=solver)
+    assert is_solvable(labyrinth, starts=[(1, 1)], solver=Solver(_make_labyrinth(SNAKE), vectorized=vectorized))
+
+
+@pytest.mark.parametrize('vectorized', VECTORIZED)
+def test_wormholes_and_river_drift(vectorized):
+    labyrinth = _make_labyrinth(SNAKE[:5])
+    # The wormhole only leads from (0, 0) to (2, 2), and the flow carries from (0, 1) to (0, 2).
+    labyrinth.next_wormhole = {(0, 0): (2, 2)}
+    labyrinth.junctions[(1, 1), (0, 1)] = 'nothing'
+    labyrinth.river_drift = {(0, 1): (0, 2)}
+    solver = Solver(labyrinth, vectorized=vectorized)
+
+    from_exit = solver.player_field((0, 0))
+    assert solver.distance(from_exit, (2, 2)) == 1
+    assert solver.distance(from_exit, (0, 2)) == 5
+    assert solver.distance(from_exit, (0, 1)) is None
+    assert solver.distance(solver.exit_field(), (2, 2)) is None
@@ -0,0 +1,57 @@
+""" Tests of the batched games against the game engine. """
+
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from commands import Kind
+from game import Game
+from grid import GridLabyrinth
+from player import Player
+from rng import fork_rng
+from vector_env import VectorEnv, ACTIONS, WEAPONS
+
+
+def test_steps_match_the_game_engine():
+    size, nb_envs, nb_players, seed = 6, 16, 3, 5
+    options = {'river': True, 'wormhole': True}
+    env = VectorEnv(size, nb_envs, nb_players, options, seed=seed)
+
+    # The same seeds give the same labyrinths, played by a game each.
+    games = []
+    for env_idx in range(nb_envs):
+        labyrinth = GridLabyrinth(size, nb_players, options, rng=fork_rng(seed, 'labyrinth', env_idx, 0))
+        assert bytes(labyrinth.contents.reshape(-1)) == bytes(env.contents[env_idx])
+        players = {str(p): Player(divmod(int(env.positions[env_idx, p]), size)) for p in range(nb_players)}
+        games.append(Game(labyrinth, players))
+
+    rng = np.random.default_rng(0)
+    for turn in range(200):
+        legal = env.legal_actions()
+        actions = np.array([rng.choice(np.flatnonzero(row)) if rng.random() < .8 else rng.integers(len(ACTIONS))
+                            for row in legal])
+        current = env.current.copy()
+        results = {}
+        for env_idx, game in enumerate(games):
+            if game is None: continue
+            results[env_idx] = game.step(str(current[env_idx]), ACTIONS[actions[env_idx]])
+            assert results[env_idx].accepted == bool(legal[env_idx, actions[env_idx]])
+
+        observations, rewards, done = env.step(actions, auto_reset=False)
+        for env_idx, result in results.items():
+            game = games[env_idx]
+            for p in range(nb_players):
+                player = game.players[str(p)]
+                # The weapon found in an arsenal is drawn differently by the engine.
+                if ACTIONS[actions[env_idx]].kind == Kind.ACTIVATE and p == current[env_idx]:
+                    player.weapon = WEAPONS[env.weapons[env_idx, p]]
+                x, y = player.position
+                assert x * size + y == env.positions[env_idx, p]
+                assert player.status == env.statuses[env_idx, p]
+                assert player.carry == env.carry[env_idx, p]
+            assert bytes(game.labyrinth.contents.reshape(-1)) == bytes(env.contents[env_idx])
+            assert result.game_over == bool(done[env_idx])
+            if done[env_idx]: games[env_idx] = None
+
+        if all(game is None for game in games): break
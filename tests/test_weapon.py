@@ -0,0 +1,17 @@
+""" Tests of the shared weapons. """
+
+
+import copy
+import pickle
+
+from weapon import Weapon, PISTOL, SHOTGUN, BEAR_PAW
+
+
+def test_shared_weapons_are_unpickled_as_themselves():
+    for weapon in [PISTOL, SHOTGUN, BEAR_PAW]:
+        assert pickle.loads(pickle.dumps(weapon)) is weapon
+        assert copy.deepcopy(weapon) is weapon
+
+    knife = pickle.loads(pickle.dumps(Weapon('knife', 1, 1)))
+    assert (knife.name, knife.damage, knife.distance) == ('knife', 1, 1)
+    assert knife is not PISTOL and knife != Weapon('knife', 1, 1)